@@ -1,203 +1,161 @@
+import logging
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill
-from openpyxl.utils import get_column_letter
 from io import BytesIO
-from calendar import monthrange
-from datetime import datetime
+
+from attendance import ledger
+from attendance.cache import ContentCache, content_hash, frame_size
+from attendance.ingest import read_biometric, read_hrms
+from attendance.instrument import StageTimer
+from attendance.jobs import FAILED, JobPool
+from attendance.memo import EmployeeMemo
+from attendance.report import build_sheets, write_shards
+from attendance.schema import inspect_biometric, inspect_hrms
+from attendance.shards import grouping_columns
+from attendance.shifts import ShiftPolicy, policies_from_table, policy_table
+from attendance.writer import EXPORT_FORMATS, export_file_name, write_export
 
 st.set_page_config(page_title="HRMS Attendance Report", page_icon="🕒")
 
-def check_punch_status(row):
+# Stage timings are logged as one JSON line per stage
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s')
+logger = logging.getLogger('attendance.app')
+
+# Upload and report caches are bounded by the size of what they hold
+FRAME_CACHE_BYTES = 512 * 1024 * 1024
+REPORT_CACHE_BYTES = 256 * 1024 * 1024
+# Background report jobs: concurrent runs, how long results are kept and
+# how often a waiting page checks on its job
+JOB_WORKERS = 4
+JOB_KEEP_SECONDS = 60 * 60
+POLL_SECONDS = 0.5
+# Processes per job classifying employees or months, and writing shard
+# workbooks. Jobs run on threads of the Streamlit server, so a pool would
+# be forked from a threaded process, and every concurrent job would start
+# its own. spawn/forkserver children re-run this script, which Streamlit
+# installs as __main__. Raise these only on a dedicated multi-core host.
+CLASSIFY_WORKERS = 1
+# Sharded archives: worker processes writing workbooks and where ZIPs are kept
+SHARD_WORKERS = 1
+ARCHIVE_DIR = Path(tempfile.gettempdir()) / 'attendance-archives'
+# Employee-months of classified rows kept for re-uploads
+MEMO_MAX_ENTRIES = 500_000
+# Every processed month is added to this SQLite ledger (None to disable)
+LEDGER_PATH = Path('attendance_ledger.sqlite')
+
+def run_report_job(job, caches, attendance_bytes, hrms_bytes, report_key, excel_writer, date_range, shift_policy,
+                   shard_by=None, formats=('xlsx',), memo=None):
+    """
+    Background job body: parse the uploads (through the frame cache),
+    classify once with progress updates and write every requested format.
+    Returns {format: bytes}, each also kept in the report cache. With
+    shard_by the 'xlsx' entry is instead the path of a ZIP of per-group
+    workbooks in ARCHIVE_DIR. `memo` (an EmployeeMemo) lets a re-upload
+    reclassify only the employees whose rows or punches changed.
+    """
+    frame_cache, report_cache = caches
+    timer = StageTimer(run_id=report_key[:12])
+    job.info['timer'] = timer
+    keys = {fmt: content_hash(report_key, fmt) for fmt in formats}
+    outputs = {fmt: report_cache.get(key) for fmt, key in keys.items() if not (shard_by and fmt == 'xlsx')}
+    outputs = {fmt: output for fmt, output in outputs.items() if output is not None}
+    job.info['report_hit'] = len(outputs) == len(formats)
+    if job.info['report_hit']:
+        return outputs
+
+    job.update(stage='Reading uploads')
+    with timer.stage('read_biometric') as record:
+        attendance_data, job.info['attendance_hit'] = frame_cache.get_or_compute(
+            content_hash('biometric', attendance_bytes), lambda: read_biometric(BytesIO(attendance_bytes)))
+        record['rows'] = len(attendance_data)
+    with timer.stage('read_hrms') as record:
+        hrms_data, job.info['hrms_hit'] = frame_cache.get_or_compute(
+            content_hash('hrms', hrms_bytes), lambda: read_hrms(BytesIO(hrms_bytes)))
+        record['rows'] = len(hrms_data)
+
+    def progress(done, total):
+        job.update(stage='Writing output' if done >= total else 'Classifying employees', done=done, total=total)
+
+    job.update(stage='Classifying employees', done=0, total=len(hrms_data))
+    # Building the report adds columns, so never hand it the cached frame
+    sheets = build_sheets(attendance_data.copy(), hrms_data.copy(), date_range=date_range,
+                          shift_policy=shift_policy, timer=timer, progress=progress, workers=CLASSIFY_WORKERS,
+                          memo=memo)
+    job.info['sheets'] = len(sheets)
+    months = [frame for frame in sheets.values() if 'recomputed' in frame.attrs]
+    job.info['recomputed'] = sum(frame.attrs['recomputed'] for frame in months)
+    job.info['employee_rows'] = sum(len(frame) for frame in months)
+    if LEDGER_PATH is not None:
+        job.update(stage='Updating the ledger')
+        try:
+            with timer.stage('ledger') as record:
+                job.info['ledger'] = ledger.record_sheets(LEDGER_PATH, sheets)
+                record['rows'] = sum(job.info['ledger'].values())
+        except Exception as e:
+            # The report is still written; only the ledger misses this run
+            logger.exception("Ledger update failed for job %s", job.id)
+            job.info['ledger_error'] = str(e) or type(e).__name__
+    for fmt in formats:
+        if fmt in outputs:
+            continue
+        if shard_by and fmt == 'xlsx':
+            ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+            path = ARCHIVE_DIR / f'{job.id}.zip'
+            job.info['archive_path'] = path
+            job.info['shard_by'] = shard_by
+            job.info['shards'] = write_shards(sheets, hrms_data, shard_by, path, excel_writer=excel_writer,
+                                              timer=timer, workers=SHARD_WORKERS)
+            outputs[fmt] = path
+        else:
+            outputs[fmt] = write_export(sheets, fmt, writer=excel_writer, timer=timer).getvalue()
+            report_cache.put(keys[fmt], outputs[fmt])
+    return outputs
+
+def show_ledger(path):
     """
-    Check punch in/out status and return appropriate status message
+    Year-to-date / date range questions answered from the ledger
     """
-    punch_in = pd.isna(row['Punch_In_Time'])
-    punch_out = pd.isna(row['Punch_Out_Time'])
-    
-    if punch_in and punch_out:
-        return 'AT'
-    elif punch_in and not punch_out:
-        return 'Morning Punch Miss'
-    elif not punch_in and punch_out:
-        return 'Evening Punch Miss'
-    return None
-
-def process_attendance(attendance_data, hrms_data):
-    # Convert Punch Date to datetime and extract components
-    attendance_data['Punch_Date'] = pd.to_datetime(attendance_data['Punch_Date'], errors='coerce')
-    
-    # Process punch times - handling the new format
-    attendance_data['Punch_In_Time'] = pd.to_datetime(attendance_data['Punch_In_Time'], errors='coerce')
-    attendance_data['Punch_Out_Time'] = pd.to_datetime(attendance_data['Punch_Out_Time'], errors='coerce')
-    
-    # Extract time components
-    attendance_data['Time IN HH:MM'] = attendance_data['Punch_In_Time'].dt.strftime('%H:%M')
-    attendance_data['Time OUT HH:MM'] = attendance_data['Punch_Out_Time'].dt.strftime('%H:%M')
-    
-    # Determine the month and year from the data
-    first_date = attendance_data['Punch_Date'].min()
-    if pd.isna(first_date):
-        st.error("No valid dates found in attendance data")
-        return None
-    
-    month = first_date.month
-    year = first_date.year
-    
-    # Get the number of days in the month
-    _, days_in_month = monthrange(year, month)
-
-    # Output DataFrame setup
-    output_columns = ['Employee Id', 'Employee Name', 'Late Count'] + \
-                    [f'Day {day}' for day in range(1, days_in_month + 1)] + \
-                    ['Leaves Count', 'PL Count', 'CL Count', 'LL Count', 'LWP Count']
-    output_data = pd.DataFrame(columns=output_columns)
-
-    # Process each employee
-    for _, emp_hrms_row in hrms_data.iterrows():
-        emp_id = emp_hrms_row['Employee Id']
-        emp_name = emp_hrms_row['Employee Name']
-        late_count = 0
-        pl_count = cl_count = ll_count = lwp_count = 0
-
-        emp_row = {'Employee Id': emp_id, 'Employee Name': emp_name, 'Late Count': 0}
-
-        for day in range(1, days_in_month + 1):
-            day_str = f'{day:02d}-{month:02d}-{year}'
-            day_column = f'Day {day}'
-            emp_row[day_column] = None
-
-            if day_str in hrms_data.columns:
-                hrms_value = emp_hrms_row[day_str]
-
-                if hrms_value in ['HD', 'WOff']:
-                    emp_row[day_column] = hrms_value
-                    continue
-
-                if hrms_value == 'Not Enrolled':
-                    emp_row[day_column] = 'Not Enrolled'
-                    continue
-                
-                if hrms_value in ['PL/PT', 'CL/PT']:
-                    # Get punch records for the employee and day
-                    punch_day_records = attendance_data[
-                        (attendance_data['Employee_ID'] == emp_id) &
-                        (attendance_data['Punch_Date'].dt.day == day) &
-                        (attendance_data['Punch_Date'].dt.month == month) &
-                        (attendance_data['Punch_Date'].dt.year == year)
-                    ]
-
-                    if punch_day_records.empty:
-                        emp_row[day_column] = 'AT'
-                    else:
-                        punch_status = check_punch_status(punch_day_records.iloc[0])
-                        if punch_status == 'AT':
-                            emp_row[day_column] = 'AT'
-                        else:
-                            emp_row[day_column] = 'Half Day Leave'
-                    continue
-
-                if hrms_value in ['PL', 'CL', 'LL', 'LWP']:
-                    emp_row[day_column] = hrms_value
-                    if hrms_value == 'PL':
-                        pl_count += 1
-                    elif hrms_value == 'CL':
-                        cl_count += 1
-                    elif hrms_value == 'LL':
-                        ll_count += 1
-                    elif hrms_value == 'LWP':
-                        lwp_count += 1
-                    continue
-
-                # Get all punch records for the day using the new date format
-                punch_day_records = attendance_data[
-                    (attendance_data['Employee_ID'] == emp_id) & 
-                    (attendance_data['Punch_Date'].dt.day == day) & 
-                    (attendance_data['Punch_Date'].dt.month == month) & 
-                    (attendance_data['Punch_Date'].dt.year == year) 
-                ]
-                
-                if hrms_value == 'PT':
-                    if punch_day_records.empty:
-                        emp_row[day_column] = 'AT'
-                    else:
-                        # Check punch status for each record
-                        punch_status = check_punch_status(punch_day_records.iloc[0])
-                        if punch_status:
-                            emp_row[day_column] = punch_status
-                        else:
-                            punch_in_time = punch_day_records.iloc[0]['Time IN HH:MM']
-                            shift_name = punch_day_records.iloc[0]['Shift_Name']
-
-                            if shift_name.strip().lower() == 'general' and punch_in_time > '09:45':
-                                emp_row[day_column] = f'GSL {punch_in_time}'
-                                late_count += 1
-                            elif shift_name.strip().lower() == 'evening shift' and punch_in_time > '16:30':
-                                emp_row[day_column] = f'ESL {punch_in_time}'
-                                late_count += 1
-                            else:
-                                emp_row[day_column] = 'PT'
-                elif hrms_value == 'WFH':
-                    emp_row[day_column] = 'WFH'
-
-        emp_row['Late Count'] = late_count
-        emp_row['Leaves Count'] = pl_count + cl_count + ll_count + lwp_count
-        emp_row['PL Count'] = pl_count
-        emp_row['CL Count'] = cl_count
-        emp_row['LL Count'] = ll_count
-        emp_row['LWP Count'] = lwp_count
-
-        output_data = pd.concat([output_data, pd.DataFrame([emp_row])], ignore_index=True)
-
-    # Generate Excel output
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        output_data.to_excel(writer, index=False, sheet_name='Attendance Report')
-        workbook = writer.book
-        worksheet = writer.sheets['Attendance Report']
-
-        # Color mapping
-        category_colors = {
-            'HD': PatternFill(start_color='B0C4DE', end_color='B0C4DE', fill_type='solid'),
-            'WOff': PatternFill(start_color='D3D3D3', end_color='D3D3D3', fill_type='solid'),
-            'PL': PatternFill(start_color='98FB98', end_color='98FB98', fill_type='solid'),
-            'CL': PatternFill(start_color='ADD8E6', end_color='ADD8E6', fill_type='solid'),
-            'LL': PatternFill(start_color='FFA07A', end_color='FFA07A', fill_type='solid'),
-            'LWP': PatternFill(start_color='eb9c42', end_color='eb9c42', fill_type='solid'),
-            'WFH': PatternFill(start_color='FFFACD', end_color='FFFACD', fill_type='solid'),
-            'Morning Punch Miss': PatternFill(start_color='FF9999', end_color='FF9999', fill_type='solid'),
-            'Evening Punch Miss': PatternFill(start_color='FFB366', end_color='FFB366', fill_type='solid'),
-            'AT': PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid'),
-            'PT': PatternFill(start_color='00FF00', end_color='00FF00', fill_type='solid'),
-            'Not Enrolled': PatternFill(start_color='eb4d4d', end_color='eb4d4d', fill_type='solid'),
-            'Half Day': PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid'),
-        }
-
-        # Apply green color to Employee Id and Employee Name columns
-        pt_fill = category_colors['PT']
-        for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=1, max_col=2):
-            for cell in row:
-                cell.fill = pt_fill
-
-        # Modified color application to handle GSL and ESL formats
-        gsl_fill = PatternFill(start_color='d8aaf2', end_color='d8aaf2', fill_type='solid')
-        esl_fill = PatternFill(start_color='83f7f0', end_color='83f7f0', fill_type='solid')
-        
-        for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=4, max_col=worksheet.max_column):
-            for cell in row:
-                if cell.value:
-                    # Convert cell value to string before checking
-                    cell_value = str(cell.value)
-                    if cell_value.startswith('GSL'):
-                        cell.fill = gsl_fill
-                    elif cell_value.startswith('ESL'):
-                        cell.fill = esl_fill
-                    elif cell_value in category_colors:
-                        cell.fill = category_colors[cell_value]
-
-    output.seek(0)
-    return output
+    st.subheader("Attendance ledger")
+    if path is None or not path.exists():
+        st.caption("Processed months are added to the ledger; none yet.")
+        return
+    conn = ledger.connect(path)
+    try:
+        months = ledger.recorded_months(conn)
+        st.caption("Months in the ledger: " + ", ".join(f"{year}-{month:02d}" for year, month in
+                                                         zip(months['year'], months['month'])))
+        picked = st.date_input("Period", value=ledger.year_to_date(), key='ledger_period')
+        if len(picked) != 2:
+            return
+        start, end = picked
+        employee_id = st.text_input("Employee Id (leave empty for everyone)", key='ledger_employee').strip() or None
+        statuses = st.multiselect("Statuses", ['PL', 'CL', 'LL', 'LWP', ledger.LATE, 'AT', 'Half Day Leave', 'WFH',
+                                               'Morning Punch Miss', 'Evening Punch Miss'],
+                                  default=['PL', 'CL', 'LL', 'LWP'], key='ledger_statuses')
+        started = time.perf_counter()
+        counts = ledger.status_counts(conn, start, end, employee_id=employee_id, statuses=statuses)
+        late = ledger.late_counts(conn, start, end)
+        days = ledger.employee_days(conn, employee_id, start, end) if employee_id else None
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    if len(counts):
+        counts = counts.pivot_table(index='employee_id', columns='status', values='days', aggfunc='sum',
+                                    fill_value=0)
+    st.dataframe(counts)
+    st.write("Late days by shift")
+    st.dataframe(late, hide_index=True)
+    if days is not None:
+        st.write(f"Days of employee {employee_id}")
+        st.dataframe(days, hide_index=True)
+    st.caption(f"Answered from the ledger in {elapsed * 1000:.0f} ms")
+
 
 # Streamlit Interface
 st.title("Monthly Attendance Processing System!")
@@ -205,24 +163,171 @@ st.title("Monthly Attendance Processing System!")
 st.subheader("Upload Files")
 attendance_file = st.file_uploader("Upload Biometric Data (Excel)", type=['xlsx'])
 hrms_file = st.file_uploader("Upload HRMS Data (CSV)", type=['csv'])
+export_formats = st.multiselect("Export formats", list(EXPORT_FORMATS), default=['xlsx'],
+                                format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+                                help="CSV and Parquet are unstyled tables with the same columns, for payroll imports")
+fast_writer = st.checkbox("Fast Excel writer", value=True,
+                          help="Stream the workbook and colour it with conditional formatting rules")
+multi_month = st.checkbox("Multi-month / date range report",
+                          help="One sheet per month plus a Totals sheet instead of only the first month")
+date_range = None
+if multi_month:
+    picked = st.date_input("Date range (leave empty for every month in the biometric file)", value=[])
+    date_range = (picked[0], picked[-1]) if picked else (None, None)
+shard_by = None
+if hrms_file:
+    try:
+        hrms_columns = pd.read_csv(BytesIO(hrms_file.getvalue()), nrows=0)
+    except (ValueError, UnicodeDecodeError):
+        hrms_columns = pd.DataFrame()
+    group_columns = grouping_columns(hrms_columns)
+    if group_columns:
+        picked_group = st.selectbox("Split into one workbook per", ['(single workbook)'] + group_columns,
+                                    help="Download a ZIP with one workbook per department, location or manager")
+        shard_by = None if picked_group == '(single workbook)' else picked_group
+with st.expander("Shift policies"):
+    st.caption("A punch-in after the cutoff (or start + grace minutes) is late and shown as '<label> HH:MM'.")
+    policy_rows = st.data_editor(policy_table(), num_rows='dynamic', hide_index=True)
+
+@st.cache_resource
+def get_caches():
+    """
+    Process-wide caches shared by every session: parsed upload frames and
+    finished report bytes, each keyed by a hash of the uploaded bytes
+    """
+    frame_cache = ContentCache(max_bytes=FRAME_CACHE_BYTES, size_of=frame_size)
+    report_cache = ContentCache(max_bytes=REPORT_CACHE_BYTES)
+    return frame_cache, report_cache
+
+
+@st.cache_resource
+def get_employee_memo():
+    """
+    Classified rows per employee, shared by every session: re-uploads with a
+    few corrected HRMS codes only reclassify the employees that changed
+    """
+    return EmployeeMemo(max_entries=MEMO_MAX_ENTRIES)
+
+
+@st.cache_resource
+def get_job_pool():
+    """
+    Background workers shared by every session, so a long month neither
+    blocks the page nor is lost when the script reruns
+    """
+    return JobPool(max_workers=JOB_WORKERS, keep_seconds=JOB_KEEP_SECONDS, on_expire=remove_archive)
+
+
+def remove_archive(job):
+    path = job.info.get('archive_path')
+    if path is not None:
+        path.unlink(missing_ok=True)
+
+
+def show_stage_timings(timer):
+    with st.expander(f"Run details: {len(timer.stages)} stages, {timer.total_seconds():.2f}s"):
+        st.dataframe(pd.DataFrame(timer.as_rows(), columns=['stage', 'seconds', 'rss_mb', 'rows']),
+                     hide_index=True)
+
+
+def show_job(job):
+    """
+    Progress bar while the job runs (polling by rerunning the script), then
+    the result. Reruns and reconnects land here again with the same job.
+    """
+    if job is None:
+        st.warning("That report job has expired. Please process the files again.")
+        return
+    if not job.finished:
+        text = f"{job.stage}: {job.done:,} / {job.total:,} employees" if job.total else job.stage
+        st.progress(job.fraction, text=text)
+        st.caption(f"Job {job.id[:8]} is running in the background; you can keep working or come back later.")
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+    if job.status == FAILED:
+        st.error(f"An error occurred while processing the files: {job.error}")
+    elif job.info.get('report_hit'):
+        st.info("Report cache hit: identical uploads were processed before.")
+    else:
+        st.info(f"Report cache miss. Biometric parse: {'hit' if job.info.get('attendance_hit') else 'miss'}, "
+                f"HRMS parse: {'hit' if job.info.get('hrms_hit') else 'miss'}.")
+        if 'recomputed' in job.info:
+            st.info(f"Recomputed {job.info['recomputed']:,} of {job.info['employee_rows']:,} employee rows; "
+                    "the rest were unchanged since an earlier upload and reused.")
+    if job.info.get('ledger'):
+        st.caption("Added to the ledger: " + ", ".join(f"{year}-{month:02d}" for year, month in job.info['ledger']))
+    if job.info.get('ledger_error'):
+        st.warning(f"The report was not added to the ledger: {job.info['ledger_error']}")
+    frame_cache, report_cache = get_caches()
+    st.caption(f"Cache totals: frames {frame_cache.hits} hits / {frame_cache.misses} misses, "
+               f"reports {report_cache.hits} hits / {report_cache.misses} misses")
+
+    if job.result:
+        st.success("Processing complete! Download your files below.")
+    for fmt, output in (job.result or {}).items():
+        if isinstance(output, Path):
+            # Read only when the button is clicked, not on every rerun. download_button
+            # needs the whole payload, so the ZIP is in memory while it is served
+            st.download_button(
+                f"Download Reports (ZIP, one workbook per {job.info['shard_by']}, "
+                f"{len(job.info['shards'])} files)",
+                data=lambda path=output: path.read_bytes(),
+                file_name="attendance_reports.zip",
+                mime="application/zip",
+                key=f'download_{fmt}'
+            )
+        else:
+            n_sheets = job.info.get('sheets', 1)
+            st.download_button(
+                f"Download {EXPORT_FORMATS[fmt]['label']}",
+                data=output,
+                file_name=export_file_name('attendance_report', fmt, n_sheets),
+                mime='application/zip' if export_file_name('', fmt, n_sheets).endswith('.zip')
+                else EXPORT_FORMATS[fmt]['mime'],
+                key=f'download_{fmt}'
+            )
+    timer = job.info.get('timer')
+    if timer is not None and timer.stages:
+        show_stage_timings(timer)
+
 
 if st.button("Process Files"):
-    if attendance_file and hrms_file:
+    if not export_formats:
+        st.error("Please choose at least one export format.")
+    elif attendance_file and hrms_file:
         try:
-            attendance_data = pd.read_excel(attendance_file)
-            hrms_data = pd.read_csv(hrms_file)
-
-            output = process_attendance(attendance_data, hrms_data)
-            
-            if output:
-                st.success("Processing complete! Download your file below.")
-                st.download_button(
-                    "Download Report",
-                    data=output,
-                    file_name="attendance_report.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            shift_policy = ShiftPolicy(policies_from_table(policy_rows))
+            attendance_bytes = attendance_file.getvalue()
+            hrms_bytes = hrms_file.getvalue()
+            # Header and a few rows only, so a wrong file fails before the job starts
+            layout = inspect_biometric(BytesIO(attendance_bytes))
+            inspect_hrms(BytesIO(hrms_bytes))
+            excel_writer = 'fast' if fast_writer else 'openpyxl'
+            report_key = content_hash('report', content_hash('biometric', attendance_bytes),
+                                      content_hash('hrms', hrms_bytes), excel_writer, repr(date_range),
+                                      shift_policy.cache_key(), shard_by or '')
+            job = get_job_pool().submit(
+                partial(run_report_job, caches=get_caches(), attendance_bytes=attendance_bytes,
+                        hrms_bytes=hrms_bytes, report_key=report_key, excel_writer=excel_writer,
+                        date_range=date_range, shift_policy=shift_policy, shard_by=shard_by,
+                        formats=tuple(export_formats), memo=get_employee_memo()),
+                key=content_hash(report_key, *export_formats),
+            )
+            st.session_state['job_id'] = job.id
+            st.query_params['job'] = job.id
+            if layout != 'standard':
+                st.caption(f"Biometric file read with the {layout} layout.")
+        except ValueError as e:
+            st.error(f"The uploaded files cannot be processed: {e}")
         except Exception as e:
             st.error(f"An error occurred while processing the files: {str(e)}")
     else:
         st.error("Please upload both files to proceed.")
+
+job_id = st.session_state.get('job_id') or st.query_params.get('job')
+if job_id:
+    show_job(get_job_pool().get(job_id))
+
+
+with st.expander("Attendance ledger"):
+    show_ledger(LEDGER_PATH)
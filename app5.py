@@ -4,6 +4,8 @@ from openpyxl import Workbook
 from openpyxl.styles import PatternFill
 from io import BytesIO
 
+from attendance.grid import StatusGrid
+
 st.set_page_config(page_title="HRMS Attendance Report", page_icon="🕒")
 
 def process_attendance(attendance_data, hrms_data):
@@ -12,41 +14,35 @@ def process_attendance(attendance_data, hrms_data):
     attendance_data['Time HH:MM'] = attendance_data['Punch IN Time'].dt.strftime('%H:%M')
     attendance_data['Date'] = attendance_data['Punch IN Time'].dt.date
 
-    # Output DataFrame setup
-    output_columns = ['Employee Id', 'Employee Name', 'Late Count'] + [f'Day {day}' for day in range(1, 32)] + ['Leaves Count', 'PL Count', 'CL Count', 'LL Count', 'LWP Count']
-    output_data = pd.DataFrame(columns=output_columns)
+    # Preallocated report grid, one row per HRMS employee
+    grid = StatusGrid(hrms_data['Employee Id'], hrms_data['Employee Name'], 31)
 
     # Process each employee
-    for _, emp_hrms_row in hrms_data.iterrows():
+    for row, (_, emp_hrms_row) in enumerate(hrms_data.iterrows()):
         emp_id = emp_hrms_row['Employee Id']
-        emp_name = emp_hrms_row['Employee Name']
         late_count = 0
         pl_count = cl_count = ll_count = lwp_count = 0
 
-        emp_row = {'Employee Id': emp_id, 'Employee Name': emp_name, 'Late Count': 0}
-
         for day in range(1, 32):
             day_str = f'{day:02d}-01-2024'
-            day_column = f'Day {day}'
-            emp_row[day_column] = None
 
             if day_str in hrms_data.columns:
                 hrms_value = emp_hrms_row[day_str]
 
                 if hrms_value == 'Not Enrolled':
-                    emp_row[day_column] = 'Not Enrolled'
+                    grid.set_cell(row, day - 1, 'Not Enrolled')
                     continue
 
                 if hrms_value == 'PL/PT':  # Check for 'PL/PT' or similar values
-                    emp_row[day_column] = 'Half Day'
+                    grid.set_cell(row, day - 1, 'Half Day')
                     continue
 
                 if hrms_value in ['HD', 'WOff']:
-                    emp_row[day_column] = hrms_value
+                    grid.set_cell(row, day - 1, hrms_value)
                     continue
 
                 if hrms_value in ['PL', 'CL', 'LL', 'LWP']:
-                    emp_row[day_column] = hrms_value
+                    grid.set_cell(row, day - 1, hrms_value)
                     if hrms_value == 'PL':
                         pl_count += 1
                     elif hrms_value == 'CL':
@@ -68,26 +64,25 @@ def process_attendance(attendance_data, hrms_data):
                         shift_name = punch_day_records.iloc[0]['shift_name']
 
                         if shift_name.strip().lower() == 'general' and punch_in_time > '09:45':
-                            emp_row[day_column] = 'General Shift Late'
+                            grid.set_cell(row, day - 1, 'General Shift Late')
                             late_count += 1
                         elif shift_name.strip().lower() == 'evening shift' and punch_in_time > '14:30':
-                            emp_row[day_column] = 'Evening Shift Late'
+                            grid.set_cell(row, day - 1, 'Evening Shift Late')
                             late_count += 1
                         else:
-                            emp_row[day_column] = 'PT'
+                            grid.set_cell(row, day - 1, 'PT')
                     else:
-                        emp_row[day_column] = 'Punch Miss'
+                        grid.set_cell(row, day - 1, 'Punch Miss')
                 elif hrms_value == 'WFH':
-                    emp_row[day_column] = 'WFH'
+                    grid.set_cell(row, day - 1, 'WFH')
 
-        emp_row['Late Count'] = late_count
-        emp_row['Leaves Count'] = pl_count + cl_count + ll_count + lwp_count
-        emp_row['PL Count'] = pl_count
-        emp_row['CL Count'] = cl_count
-        emp_row['LL Count'] = ll_count
-        emp_row['LWP Count'] = lwp_count
+        grid.counts['Late'][row] = late_count
+        grid.counts['PL'][row] = pl_count
+        grid.counts['CL'][row] = cl_count
+        grid.counts['LL'][row] = ll_count
+        grid.counts['LWP'][row] = lwp_count
 
-        output_data = pd.concat([output_data, pd.DataFrame([emp_row])], ignore_index=True)
+    output_data = grid.to_frame()
 
     # Generate Excel output
     output = BytesIO()
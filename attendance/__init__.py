@@ -0,0 +1,9 @@
+"""
+Attendance report core, importable without Streamlit.
+
+openpyxl and xlsxwriter are imported only when a biometric workbook is
+read or a report workbook is written.
+"""
+from attendance.report import build_sheets, generate_exports, generate_report, process_attendance, write_shards
+
+__all__ = ['build_sheets', 'generate_exports', 'generate_report', 'process_attendance', 'write_shards']
@@ -0,0 +1,164 @@
+"""
+Headless batch mode: build one attendance workbook per (biometric, HRMS)
+file pair, spread across a process pool.
+
+    python -m attendance.batch --dir month_end/ --out reports/
+    python -m attendance.batch --manifest jobs.csv --out reports/ --workers 8
+
+A manifest is a CSV with `biometric` and `hrms` columns and an optional
+`output` column. In directory mode every `<name>.xlsx` is paired with
+`<name>.csv` in the same directory.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from attendance.columnar import load_biometric, load_hrms
+from attendance.datetimes import datetime_format
+from attendance.pipeline import build_report
+from attendance.shards import write_shard_archive
+from attendance.shifts import ShiftPolicy, load_shift_policies
+from attendance.writer import SHEET_NAME, write_report
+
+SUMMARY_COLUMNS = ['job', 'status', 'seconds', 'employees', 'output', 'error']
+
+
+def find_pairs(directory):
+    """
+    Pair every <name>.xlsx with <name>.csv in directory
+    """
+    directory = Path(directory)
+    pairs = []
+    for biometric in sorted(directory.glob('*.xlsx')):
+        if biometric.name.startswith('~$'):
+            continue
+        hrms = biometric.with_suffix('.csv')
+        if hrms.exists():
+            pairs.append({'job': biometric.stem, 'biometric': biometric, 'hrms': hrms})
+    return pairs
+
+
+def read_manifest(manifest):
+    manifest = Path(manifest)
+    pairs = []
+    with open(manifest, newline='') as f:
+        for row in csv.DictReader(f):
+            biometric = manifest.parent / row['biometric']
+            pair = {'job': biometric.stem, 'biometric': biometric, 'hrms': manifest.parent / row['hrms']}
+            if row.get('output'):
+                pair['output'] = manifest.parent / row['output']
+            pairs.append(pair)
+    return pairs
+
+
+def run_job(job, biometric, hrms, output, excel_writer='fast', columnar_cache=True, shift_policies=None,
+            datetime_formats=None, shard_by=None):
+    """
+    Process one file pair and write its workbook, or with shard_by a ZIP of
+    one workbook per value of that HRMS column. Never raises: failures are
+    reported in the returned summary row.
+    """
+    started = time.perf_counter()
+    summary = {'job': job, 'output': str(output), 'employees': 0, 'error': ''}
+    try:
+        attendance_data = load_biometric(biometric, use_cache=columnar_cache, datetime_formats=datetime_formats)
+        hrms_data = load_hrms(hrms, use_cache=columnar_cache)
+        output_data = build_report(attendance_data, hrms_data, ShiftPolicy(shift_policies))
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        if shard_by:
+            # Jobs already run in parallel, so each archive is written in-process
+            write_shard_archive({SHEET_NAME: output_data}, hrms_data, shard_by, output, writer=excel_writer,
+                                workers=1)
+        else:
+            Path(output).write_bytes(write_report(output_data, writer=excel_writer).getvalue())
+        summary.update(status='ok', employees=len(output_data))
+    except Exception as e:
+        summary.update(status='failed', error=f'{type(e).__name__}: {e}')
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def default_output_name(job, shard_by=None):
+    return f'{job}_attendance_reports.zip' if shard_by else f'{job}_attendance_report.xlsx'
+
+
+def run_batch(pairs, out_dir, workers=None, excel_writer='fast', columnar_cache=True, shift_policies=None,
+              datetime_formats=None, shard_by=None):
+    """
+    Run every pair on a process pool and return the summary rows in
+    manifest order
+    """
+    out_dir = Path(out_dir)
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_job, pair['job'], pair['biometric'], pair['hrms'],
+                        pair.get('output') or out_dir / default_output_name(pair['job'], shard_by),
+                        excel_writer, columnar_cache, shift_policies, datetime_formats, shard_by): pair['job']
+            for pair in pairs
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries[futures[future]] = summary
+            print(f"{summary['status']:>6}  {summary['seconds']:>8.2f}s  {summary['job']}"
+                  + (f"  {summary['error']}" if summary['error'] else ''), flush=True)
+    return [summaries[pair['job']] for pair in pairs]
+
+
+def write_summary(summaries, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate attendance reports for many branch/month file pairs.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--manifest', help="CSV with biometric,hrms[,output] columns")
+    source.add_argument('--dir', help="directory of <name>.xlsx / <name>.csv pairs")
+    parser.add_argument('--out', default='reports', help="output directory (default: reports)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: CPU count)")
+    parser.add_argument('--writer', choices=['fast', 'openpyxl'], default='fast', help="Excel writer")
+    parser.add_argument('--no-columnar-cache', dest='columnar_cache', action='store_false',
+                        help="always parse the source files instead of reusing the .attendance.feather files")
+    parser.add_argument('--shift-policies', help="JSON file of shift late policies (default: built-in)")
+    parser.add_argument('--datetime-format', dest='datetime_formats', action='append', type=datetime_format,
+                        metavar='COLUMN=FORMAT',
+                        help="strftime format of a text punch column, e.g. 'Punch_Date=%%d-%%m-%%Y' "
+                             "(repeatable; detected from the data when not given)")
+    parser.add_argument('--shard-by', metavar='COLUMN',
+                        help="HRMS column (department, location, manager) to split each report by; "
+                             "writes a ZIP of one workbook per value")
+    args = parser.parse_args(argv)
+    shift_policies = load_shift_policies(args.shift_policies) if args.shift_policies else None
+    datetime_formats = dict(args.datetime_formats) if args.datetime_formats else None
+
+    pairs = read_manifest(args.manifest) if args.manifest else find_pairs(args.dir)
+    if not pairs:
+        parser.error("no biometric/HRMS pairs found")
+    if len({pair['job'] for pair in pairs}) != len(pairs):
+        parser.error("job names (biometric file stems) must be unique")
+
+    started = time.perf_counter()
+    summaries = run_batch(pairs, args.out, workers=args.workers, excel_writer=args.writer,
+                          columnar_cache=args.columnar_cache, shift_policies=shift_policies,
+                          datetime_formats=datetime_formats, shard_by=args.shard_by)
+    elapsed = time.perf_counter() - started
+
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    summary_path = Path(args.out) / 'batch_summary.csv'
+    write_summary(summaries, summary_path)
+
+    failed = sum(summary['status'] != 'ok' for summary in summaries)
+    print(f"{len(summaries) - failed}/{len(summaries)} reports written in {elapsed:.2f}s "
+          f"with {args.workers} workers; summary in {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(*parts):
+    """
+    SHA-256 over the given bytes/str parts, used as a cache key for uploads
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def frame_size(frame):
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class ContentCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its values in bytes.
+    Entries larger than max_bytes are not stored.
+    """
+
+    def __init__(self, max_bytes, size_of=len):
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def current_bytes(self):
+        return self._bytes
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        """
+        Return (value, hit). On a miss the value is computed and stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        value = compute()
+        if value is not None:
+            self.put(key, value)
+        return value, False
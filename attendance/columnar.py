@@ -0,0 +1,136 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from attendance.datetimes import DATETIME_COLUMNS, parse_datetimes
+from attendance.ingest import read_biometric, read_hrms, share_day_categories
+
+CACHE_SUFFIX = '.attendance.feather'
+METADATA_KEY = b'attendance_source'
+# Bump when the normalized layout changes so old cache files are rebuilt
+CACHE_VERSION = '3'
+
+
+def cache_path(source):
+    source = Path(source)
+    return source.with_name(source.name + CACHE_SUFFIX)
+
+
+def source_fingerprint(source):
+    """
+    Size, mtime and SHA-256 of the source file. The hash is what decides
+    validity; size/mtime only avoid rehashing an untouched file.
+    """
+    stat = Path(source).stat()
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def normalize_biometric(attendance_data):
+    attendance_data = attendance_data.copy()
+    parse_datetimes(attendance_data, DATETIME_COLUMNS)
+    attendance_data['Shift_Name'] = attendance_data['Shift_Name'].astype('category')
+    return attendance_data
+
+
+def normalize_hrms(hrms_data):
+    hrms_data = hrms_data.copy()
+    share_day_categories([hrms_data])
+    return hrms_data
+
+
+def _cache_version(datetime_formats=None):
+    """
+    CACHE_VERSION, suffixed with a digest of explicit datetime formats so a
+    file parsed with other formats is not reused
+    """
+    if not datetime_formats:
+        return CACHE_VERSION
+    digest = hashlib.sha256(json.dumps(datetime_formats, sort_keys=True).encode()).hexdigest()
+    return f'{CACHE_VERSION}-{digest[:12]}'
+
+
+def _read_cached(path, source, cache_version):
+    """
+    The cached frame if the cache file was built from the current source.
+    The file is memory-mapped; to_pandas still copies it into pandas
+    columns, but no workbook or CSV is parsed. A cache file that cannot be
+    read (truncated, foreign, or from another Arrow version) is a miss.
+    """
+    from pyarrow import feather
+
+    try:
+        table = feather.read_table(path, memory_map=True)
+        metadata = (table.schema.metadata or {}).get(METADATA_KEY)
+        if metadata is None:
+            return None
+        version, size, mtime_ns, sha256 = metadata.decode().split(':')
+        if version != cache_version:
+            return None
+        stat = Path(source).stat()
+        if (int(size), int(mtime_ns)) != (stat.st_size, stat.st_mtime_ns):
+            if source_fingerprint(source)['sha256'] != sha256:
+                return None
+        return table.to_pandas()
+    except (OSError, ValueError):
+        # ArrowInvalid is a ValueError and ArrowIOError an OSError
+        return None
+
+
+def _write_cached(path, frame, fingerprint, cache_version):
+    import pyarrow as pa
+    from pyarrow import feather
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    metadata = f"{cache_version}:{fingerprint['size']}:{fingerprint['mtime_ns']}:{fingerprint['sha256']}"
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: metadata.encode()})
+    tmp_path = path.with_name(path.name + '.tmp')
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    tmp_path.replace(path)
+
+
+def _load(source, parse, use_cache, cache_version=CACHE_VERSION):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        use_cache = False
+    if not use_cache:
+        return parse(source)
+
+    path = cache_path(source)
+    if path.exists():
+        frame = _read_cached(path, source, cache_version)
+        if frame is not None:
+            return frame
+    fingerprint = source_fingerprint(source)
+    frame = parse(source)
+    try:
+        _write_cached(path, frame, fingerprint, cache_version)
+    except (TypeError, ValueError, OSError):
+        # Mixed-type columns Arrow cannot store, or a read-only directory
+        pass
+    return frame
+
+
+def load_biometric(source, use_cache=True, datetime_formats=None):
+    """
+    Normalized biometric punches for an .xlsx on disk. The first call
+    parses the workbook and writes a typed Feather file next to it; later
+    calls read that file instead of parsing until the source changes. Without pyarrow
+    the workbook is parsed every time.
+    """
+    return _load(source,
+                 lambda path: normalize_biometric(read_biometric(path, datetime_formats=datetime_formats)),
+                 use_cache, _cache_version(datetime_formats))
+
+
+def load_hrms(source, use_cache=True):
+    """
+    Normalized HRMS data for a .csv on disk, cached like load_biometric
+    """
+    return _load(source, lambda path: normalize_hrms(read_hrms(path)), use_cache)
@@ -0,0 +1,143 @@
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Punch columns of the biometric export that hold dates/times
+DATETIME_COLUMNS = ['Punch_Date', 'Punch_In_Time', 'Punch_Out_Time']
+
+# Layouts seen in biometric device exports, tried after the format pandas
+# guesses from the sample itself (which keeps its month-first default)
+COMMON_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d',
+    '%d-%m-%Y %H:%M:%S',
+    '%d-%m-%Y %H:%M',
+    '%d-%m-%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%d-%b-%Y %H:%M:%S',
+    '%d-%b-%Y',
+]
+SAMPLE_SIZE = 200
+
+
+def _strings(values):
+    return [value for value in values if isinstance(value, str) and value.strip()]
+
+
+def detect_format(values, sample_size=SAMPLE_SIZE):
+    """
+    strftime format that parses the most of a sample of the string values,
+    or None when there are no strings or no candidate parses any of them
+    """
+    sample = pd.Index(_strings(values)).unique()[:sample_size]
+    if len(sample) == 0:
+        return None
+    candidates = []
+    for value in sample[:5]:
+        with warnings.catch_warnings():
+            # pandas warns when it guesses a day-first layout; that is expected here
+            warnings.simplefilter('ignore', UserWarning)
+            guessed = guess_datetime_format(value)
+        if guessed and guessed not in candidates:
+            candidates.append(guessed)
+    candidates += [fmt for fmt in COMMON_FORMATS if fmt not in candidates]
+
+    best, best_parsed = None, 0
+    for fmt in candidates:
+        parsed = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best, best_parsed = fmt, parsed
+        if parsed == len(sample):
+            break
+    return best
+
+
+class DatetimeParser:
+    """
+    Parses punch columns with one fixed format per column and a cache of
+    already parsed values.
+
+    The format is taken from `formats` ({column: strftime format}) or
+    detected once from a sample of the first values seen. Each distinct
+    value is parsed once: the column is factorized, only values missing
+    from the cache are parsed, and the result is taken back by code. Keep
+    one parser across the batches of a file so formats and cached values
+    carry over.
+    """
+
+    def __init__(self, formats=None):
+        self.formats = dict(formats or {})
+        self.cache = {}
+
+    def parse(self, column, values):
+        """
+        datetime64[ns] Series of `values`; unparseable values become NaT
+        """
+        values = pd.Series(values)
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            return values.astype('datetime64[ns]')
+
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        cache = self.cache.setdefault(column, {})
+        new_values = [value for value in uniques if value not in cache]
+        if new_values:
+            cache.update(zip(new_values, self._parse_values(column, new_values)))
+        parsed = np.array([cache[value] for value in uniques] + [np.datetime64('NaT')], dtype='datetime64[ns]')
+        # NA values have code -1, which picks the trailing NaT
+        return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+    def _parse_values(self, column, values):
+        values = pd.Index(values, dtype=object)
+        strings = np.array([isinstance(value, str) for value in values], dtype=bool)
+        result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+        # Excel cells already hold datetimes; only text needs a format
+        if (~strings).any():
+            result[~strings] = pd.to_datetime(values[~strings], errors='coerce').astype('datetime64[ns]')
+        if strings.any():
+            if column not in self.formats:
+                self.formats[column] = detect_format(values[strings])
+            fmt = self.formats[column]
+            text = values[strings].str.strip()
+            parsed = np.full(len(text), np.datetime64('NaT'), dtype='datetime64[ns]')
+            if fmt is not None:
+                parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+                parsed = parsed.to_numpy(dtype='datetime64[ns]', copy=True)
+            # The odd value in another layout is parsed on its own
+            leftover = np.isnat(parsed) & (text != '')
+            if leftover.any():
+                parsed[leftover] = pd.to_datetime(text[leftover], format='mixed',
+                                                  errors='coerce').astype('datetime64[ns]')
+            result[strings] = parsed
+        return result
+
+
+def parse_datetimes(frame, columns, formats=None, parser=None):
+    """
+    Parse `columns` of frame in place to datetime64[ns] with a DatetimeParser
+    """
+    parser = parser or DatetimeParser(formats)
+    for column in columns:
+        if column in frame.columns:
+            frame[column] = parser.parse(column, frame[column])
+    return frame
+
+
+def datetime_format(value):
+    """
+    argparse type for COLUMN=FORMAT
+    """
+    column, separator, fmt = value.partition('=')
+    if not separator or column not in DATETIME_COLUMNS or not fmt:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=FORMAT with COLUMN one of {', '.join(DATETIME_COLUMNS)}")
+    return column, fmt
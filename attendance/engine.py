@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from attendance.grid import EMPTY, STATUS_CODES, StatusGrid
+from attendance.punch_index import lookup_punches
+from attendance.shifts import ShiftPolicy
+
+LEAVE_CODES = ['PL', 'CL', 'LL', 'LWP']
+HALF_DAY_CODES = ['PL/PT', 'CL/PT']
+# Employees classified per block; bounds the long-form working set and
+# sets the granularity of progress callbacks
+CLASSIFY_BLOCK_ROWS = 5000
+
+
+def day_columns(month, year, days_in_month):
+    """
+    Return the HRMS column name (DD-MM-YYYY) for every day of the month
+    """
+    return [f'{day:02d}-{month:02d}-{year}' for day in range(1, days_in_month + 1)]
+
+
+def day_status_codes(hrms_data, columns):
+    """
+    (codes, categories) of the HRMS day `columns`: an (employees, days)
+    array of category codes, -1 for blank cells, and the statuses they
+    index. Columns already sharing one categorical dtype (read_hrms) are
+    used as they are; any others are factorized together.
+    """
+    dtypes = [hrms_data[col].dtype for col in columns]
+    if dtypes and isinstance(dtypes[0], pd.CategoricalDtype) and \
+            all(isinstance(dtype, pd.CategoricalDtype) and dtype.categories.equals(dtypes[0].categories)
+                for dtype in dtypes):
+        codes = np.column_stack([hrms_data[col].cat.codes.to_numpy() for col in columns])
+        return codes, dtypes[0].categories
+    codes, categories = pd.factorize(hrms_data[columns].to_numpy(dtype=object).reshape(-1))
+    return codes.reshape(len(hrms_data), len(columns)), categories
+
+
+def melt_hrms_days(hrms_data, month, year, days_in_month):
+    """
+    Melt the HRMS DD-MM-YYYY day columns into one row per (employee, day).
+
+    `row` is the position of the employee in hrms_data and `day` is the
+    1-based day of the month. `hrms_value` is categorical. Days without an
+    HRMS column are left out.
+    """
+    columns = day_columns(month, year, days_in_month)
+    present = [(day, col) for day, col in enumerate(columns, start=1) if col in hrms_data.columns]
+
+    n_rows = len(hrms_data)
+    days = np.array([day for day, _ in present], dtype=np.int64)
+    dates = pd.to_datetime([f'{year}-{month:02d}-{day:02d}' for day in days]).astype('datetime64[ns]')
+    codes, categories = day_status_codes(hrms_data, [col for _, col in present])
+
+    return pd.DataFrame({
+        'row': np.repeat(np.arange(n_rows), len(days)),
+        'day': np.tile(days, n_rows),
+        'Employee_ID': np.repeat(hrms_data['Employee Id'].to_numpy(), len(days)),
+        'Punch_Date': np.tile(dates.to_numpy(), n_rows),
+        'hrms_value': pd.Categorical.from_codes(codes.reshape(-1), categories=categories),
+    })
+
+
+def _category_codes(categories, values):
+    """
+    Codes of those of values that are categories
+    """
+    return [categories.get_loc(value) for value in values if value in categories]
+
+
+def classify_attendance(punch_index, hrms_data, month, year, days_in_month, shift_policy=None, progress=None,
+                        block_rows=CLASSIFY_BLOCK_ROWS):
+    """
+    Build the attendance StatusGrid for every HRMS employee with
+    column-wise operations instead of a per-employee/per-day loop.
+
+    punch_index is the (Employee_ID, date) index from build_punch_index,
+    built with the same shift_policy. Statuses use each day's earliest
+    punch-in and latest punch-out; the worked minutes of every HRMS day go
+    into the grid's 'Worked Hours' column.
+
+    Employees are classified in blocks of block_rows; after each block
+    progress(employees done, total employees) is called if given.
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    grid = StatusGrid(hrms_data['Employee Id'], hrms_data['Employee Name'], days_in_month,
+                      late_labels=shift_policy.labels[:-1], worked_hours=True)
+    n_rows = len(hrms_data)
+    for start in range(0, n_rows, block_rows):
+        block = hrms_data.iloc[start:start + block_rows]
+        _classify_block(grid, start, punch_index, block, month, year, days_in_month)
+        if progress is not None:
+            progress(start + len(block), n_rows)
+    grid.recount()
+    return grid
+
+
+def _classify_block(grid, first_row, punch_index, hrms_data, month, year, days_in_month):
+    """
+    Classify the employees of hrms_data into grid rows from first_row on
+    """
+    days = melt_hrms_days(hrms_data, month, year, days_in_month)
+    punches = lookup_punches(punch_index, days['Employee_ID'], days['Punch_Date'])
+    days = pd.concat([days, punches.reset_index(drop=True)], axis=1)
+
+    # Statuses are compared as category codes, never as strings
+    hrms_value = days['hrms_value'].array
+    codes, categories = hrms_value.codes, hrms_value.categories
+    in_missing = days['Punch_In_Time'].isna().to_numpy()
+    out_missing = days['Punch_Out_Time'].isna().to_numpy()
+    # An employee-day without any punch record has both times missing, so
+    # it takes the same 'AT' branch as a record with neither punch
+    both_missing = in_missing & out_missing
+
+    # Statuses taken from the HRMS value alone, by code; the extra last
+    # entry is picked by blank cells (code -1)
+    value_status = np.full(len(categories) + 1, EMPTY, dtype=np.int8)
+    for value in ['HD', 'WOff', 'Not Enrolled', 'WFH'] + LEAVE_CODES:
+        value_status[_category_codes(categories, [value])] = STATUS_CODES[value]
+    status = value_status[codes]
+
+    half_day = np.isin(codes, _category_codes(categories, HALF_DAY_CODES))
+    status[half_day] = np.where(both_missing[half_day], STATUS_CODES['AT'], STATUS_CODES['Half Day Leave'])
+
+    present = np.isin(codes, _category_codes(categories, ['PT']))
+    status[present & both_missing] = STATUS_CODES['AT']
+    status[present & in_missing & ~out_missing] = STATUS_CODES['Morning Punch Miss']
+    status[present & ~in_missing & out_missing] = STATUS_CODES['Evening Punch Miss']
+
+    punched = present & ~in_missing & ~out_missing
+    status[punched] = STATUS_CODES['PT']
+    late = punched & days['Late'].to_numpy()
+    status[late] = grid.late_codes[days['Shift_Code'].to_numpy()[late]]
+
+    rows, columns = days['row'].to_numpy() + first_row, days['day'].to_numpy() - 1
+    grid.codes[rows, columns] = status
+    grid.late_minutes[rows[late], columns[late]] = days['In_Minutes'].to_numpy()[late]
+    grid.worked_minutes[rows, columns] = days['Worked_Minutes'].to_numpy()
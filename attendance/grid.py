@@ -0,0 +1,168 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from attendance.shifts import MINUTE_LABELS
+
+COUNT_NAMES = ['Late', 'PL', 'CL', 'LL', 'LWP']
+# Day-cell statuses every grid knows, by code; code 0 is an empty cell.
+# Late labels and any other values a grid is given get further codes.
+STATUS_LABELS = [None, 'PT', 'AT', 'Morning Punch Miss', 'Evening Punch Miss', 'Half Day Leave', 'WFH',
+                 'HD', 'WOff', 'Not Enrolled', 'PL', 'CL', 'LL', 'LWP']
+STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
+EMPTY = STATUS_CODES[None]
+MAX_CODES = np.iinfo(np.int8).max + 1
+
+
+class StatusGrid:
+    """
+    Preallocated report grid: one row per HRMS employee, one column per day
+    of the month, plus one integer count array per counter.
+
+    Day cells are int8 status codes (`codes`) indexing `labels`. Late
+    arrivals use one code per late label ('GSL', 'ESL', ...) and keep the
+    punch-in minute in the uint16 `late_minutes` array. Strings are only
+    built in render()/to_frame(), which the writers call; counts and fill
+    colours are computed on the codes. With worked_hours=True the uint16
+    `worked_minutes` of each day are summed into a 'Worked Hours' report
+    column. `attrs` carries metadata like DataFrame.attrs ('period',
+    'recomputed') and is copied to the frame.
+    """
+
+    def __init__(self, employee_ids, employee_names, days_in_month, late_labels=(), worked_hours=False):
+        self.employee_ids = np.asarray(employee_ids, dtype=object)
+        self.employee_names = np.asarray(employee_names, dtype=object)
+        self.days_in_month = days_in_month
+        n_rows = len(self.employee_ids)
+        self.labels = list(STATUS_LABELS)
+        self.late = [False] * len(STATUS_LABELS)
+        self._codes = {(label, False): code for code, label in enumerate(STATUS_LABELS)}
+        self.codes = np.full((n_rows, days_in_month), EMPTY, dtype=np.int8)
+        self.late_minutes = np.zeros((n_rows, days_in_month), dtype=np.uint16)
+        self.worked_hours = worked_hours
+        self.worked_minutes = np.zeros((n_rows, days_in_month), dtype=np.uint16)
+        self.counts = {name: np.zeros(n_rows, dtype=np.int64) for name in COUNT_NAMES}
+        # Code of each late label, in the order given (shift policy order)
+        self.late_codes = np.array([self.code(label, late=True) for label in late_labels], dtype=np.int8)
+        self.attrs = {}
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def code(self, label, late=False):
+        """
+        Status code of label, registering it on first use
+        """
+        key = (label, late)
+        if key not in self._codes:
+            if len(self.labels) >= MAX_CODES:
+                raise ValueError(f"More than {MAX_CODES} distinct day statuses")
+            self._codes[key] = len(self.labels)
+            self.labels.append(label)
+            self.late.append(late)
+        return self._codes[key]
+
+    def set_cell(self, row, col, value):
+        """
+        Store one day cell given as its plain text value (None for empty)
+        """
+        self.codes[row, col] = self.code(value)
+
+    def translate(self, other):
+        """
+        Array mapping the codes of another grid onto this grid's codes
+        """
+        return np.array([self.code(label, late) for label, late in zip(other.labels, other.late)], dtype=np.int8)
+
+    def append_rows(self, employee_ids, employee_names):
+        n_new = len(employee_ids)
+        self.employee_ids = np.concatenate([self.employee_ids, np.asarray(employee_ids, dtype=object)])
+        self.employee_names = np.concatenate([self.employee_names, np.asarray(employee_names, dtype=object)])
+        self.codes = np.vstack([self.codes, np.full((n_new, self.days_in_month), EMPTY, dtype=np.int8)])
+        self.late_minutes = np.vstack([self.late_minutes, np.zeros((n_new, self.days_in_month), dtype=np.uint16)])
+        self.worked_minutes = np.vstack([self.worked_minutes,
+                                         np.zeros((n_new, self.days_in_month), dtype=np.uint16)])
+        for name in self.counts:
+            self.counts[name] = np.concatenate([self.counts[name], np.zeros(n_new, dtype=np.int64)])
+
+    def take(self, rows):
+        """
+        New grid holding only the given row positions, with the same codes
+        """
+        grid = copy.copy(self)
+        grid.employee_ids = self.employee_ids[rows]
+        grid.employee_names = self.employee_names[rows]
+        grid.codes = self.codes[rows]
+        grid.late_minutes = self.late_minutes[rows]
+        grid.worked_minutes = self.worked_minutes[rows]
+        grid.counts = {name: counts[rows] for name, counts in self.counts.items()}
+        grid.labels, grid.late, grid._codes = list(self.labels), list(self.late), dict(self._codes)
+        grid.attrs = dict(self.attrs)
+        return grid
+
+    def recount(self):
+        """
+        Recompute the counters from the day codes
+        """
+        self.counts['Late'] = np.asarray(self.late, dtype=bool)[self.codes].sum(axis=1)
+        for name in COUNT_NAMES[1:]:
+            self.counts[name] = (self.codes == STATUS_CODES[name]).sum(axis=1)
+
+    def render(self):
+        """
+        Day cells as an object array of strings (None for empty cells)
+        """
+        cells = np.array(self.labels, dtype=object)[self.codes]
+        late = np.asarray(self.late, dtype=bool)[self.codes]
+        cells[late] = cells[late] + ' ' + MINUTE_LABELS[self.late_minutes[late]]
+        return cells
+
+    def fill_colors(self, category_colors, late_colors, late_color=None):
+        """
+        Hex fill colour (or None) per day cell, looked up by code: late
+        codes take their label's colour from late_colors (late_color for
+        labels it does not list), any other label its category colour
+        """
+        colors = []
+        for label, late in zip(self.labels, self.late):
+            text = '' if label is None else str(label)
+            colors.append(late_colors.get(text, late_color) if late else category_colors.get(text))
+        return np.array(colors, dtype=object)[self.codes]
+
+    def day_columns(self):
+        return [f'Day {day}' for day in range(1, self.days_in_month + 1)]
+
+    def output_columns(self):
+        return ['Employee Id', 'Employee Name', 'Late Count'] + self.day_columns() + \
+            ['Leaves Count', 'PL Count', 'CL Count', 'LL Count', 'LWP Count'] + \
+            (['Worked Hours'] if self.worked_hours else [])
+
+    def summary_columns(self):
+        """
+        {report column: array} of the counter and worked hours columns
+        """
+        summary = {
+            'Late Count': self.counts['Late'],
+            'Leaves Count': self.counts['PL'] + self.counts['CL'] + self.counts['LL'] + self.counts['LWP'],
+            'PL Count': self.counts['PL'],
+            'CL Count': self.counts['CL'],
+            'LL Count': self.counts['LL'],
+            'LWP Count': self.counts['LWP'],
+        }
+        if self.worked_hours:
+            summary['Worked Hours'] = (self.worked_minutes.sum(axis=1, dtype=np.int64) / 60).round(2)
+        return summary
+
+    def to_frame(self):
+        """
+        Materialize the report DataFrame in the original column order
+        """
+        cells = self.render()
+        data = {'Employee Id': self.employee_ids, 'Employee Name': self.employee_names}
+        for i, column in enumerate(self.day_columns()):
+            data[column] = cells[:, i]
+        data.update(self.summary_columns())
+        frame = pd.DataFrame(data, columns=self.output_columns())
+        frame.attrs.update(self.attrs)
+        return frame
@@ -0,0 +1,164 @@
+"""
+Incremental daily processing: keep each month's StatusGrid on local disk
+and apply only the newly exported day(s) of punches and HRMS columns.
+
+    python -m attendance.incremental --state-dir state/ today.xlsx today.csv --out report.xlsx
+"""
+import argparse
+import pickle
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from attendance.datetimes import datetime_format
+from attendance.engine import classify_attendance
+from attendance.grid import StatusGrid
+from attendance.ingest import read_biometric, read_hrms
+from attendance.pipeline import prepare_punches
+from attendance.punch_index import build_punch_index
+from attendance.shifts import ShiftPolicy, load_shift_policies
+from attendance.writer import write_report
+
+DAY_COLUMN_PATTERN = re.compile(r'^(\d{2})-(\d{2})-(\d{4})$')
+
+
+class MonthState:
+    """
+    Persisted report state of one month: the StatusGrid (cells and counters)
+    and the days that have been applied so far
+    """
+
+    def __init__(self, year, month, grid):
+        self.year = year
+        self.month = month
+        self.grid = grid
+        self.days = set()
+
+
+def hrms_day_columns_by_month(hrms_data):
+    """
+    Group the HRMS DD-MM-YYYY columns by (year, month) -> {day: column}
+    """
+    months = {}
+    for column in hrms_data.columns:
+        match = DAY_COLUMN_PATTERN.match(str(column))
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+            months.setdefault((year, month), {})[day] = column
+    return months
+
+
+def state_path(state_dir, year, month):
+    return Path(state_dir) / f'attendance_{year}_{month:02d}.pkl'
+
+
+def load_month_state(state_dir, year, month):
+    path = state_path(state_dir, year, month)
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_month_state(state_dir, state):
+    path = state_path(state_dir, state.year, state.month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(path)
+
+
+def _state_rows(grid, hrms_data):
+    """
+    Map HRMS rows onto grid rows by Employee Id, appending rows for
+    employees the month has not seen yet
+    """
+    positions = {employee_id: row for row, employee_id in enumerate(grid.employee_ids)}
+    new_ids, new_names = [], []
+    rows = np.empty(len(hrms_data), dtype=np.int64)
+    for i, (employee_id, name) in enumerate(zip(hrms_data['Employee Id'], hrms_data['Employee Name'])):
+        if employee_id not in positions:
+            positions[employee_id] = len(grid) + len(new_ids)
+            new_ids.append(employee_id)
+            new_names.append(name)
+        rows[i] = positions[employee_id]
+
+    if new_ids:
+        grid.append_rows(new_ids, new_names)
+    return rows
+
+
+def apply_update(state, punch_index, hrms_data, day_map, shift_policy=None):
+    """
+    Classify only the days in day_map ({day: HRMS column}), write them into
+    the state and recount its counters from the day codes
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    grid = state.grid
+    hrms_days = hrms_data[['Employee Id', 'Employee Name'] + list(day_map.values())]
+    update = classify_attendance(punch_index, hrms_days, state.month, state.year, grid.days_in_month, shift_policy)
+
+    rows = _state_rows(grid, hrms_days)
+    columns = np.array(sorted(day_map)) - 1
+    # The update grid numbers its late labels itself; map them onto the state's
+    codes = grid.translate(update)[update.codes[:, columns]]
+    grid.codes[np.ix_(rows, columns)] = codes
+    grid.late_minutes[np.ix_(rows, columns)] = update.late_minutes[:, columns]
+    grid.worked_minutes[np.ix_(rows, columns)] = update.worked_minutes[:, columns]
+    grid.recount()
+    state.days.update(day_map)
+    return state
+
+
+def update_month_states(state_dir, attendance_data, hrms_data, shift_policy=None):
+    """
+    Apply newly exported punches and HRMS day columns to the persisted
+    month states and save them. Returns the updated MonthState objects.
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    prepare_punches(attendance_data)
+    punch_index = build_punch_index(attendance_data, shift_policy)
+
+    states = []
+    for (year, month), day_map in sorted(hrms_day_columns_by_month(hrms_data).items()):
+        state = load_month_state(state_dir, year, month)
+        if state is None:
+            days_in_month = pd.Period(year=year, month=month, freq='M').days_in_month
+            state = MonthState(year, month, StatusGrid([], [], days_in_month, worked_hours=True))
+        apply_update(state, punch_index, hrms_data, day_map, shift_policy)
+        save_month_state(state_dir, state)
+        states.append(state)
+    return states
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply the latest day(s) of attendance to the saved month state.")
+    parser.add_argument('biometric', help="biometric export (.xlsx) with the new punches")
+    parser.add_argument('hrms', help="HRMS export (.csv) with the new day columns")
+    parser.add_argument('--state-dir', default='attendance_state', help="where month states are kept")
+    parser.add_argument('--out', help="write the latest updated month's report to this .xlsx")
+    parser.add_argument('--writer', choices=['fast', 'openpyxl'], default='fast', help="Excel writer")
+    parser.add_argument('--shift-policies', help="JSON file of shift late policies (default: built-in)")
+    parser.add_argument('--datetime-format', dest='datetime_formats', action='append', type=datetime_format,
+                        metavar='COLUMN=FORMAT', help="strftime format of a text punch column (repeatable)")
+    args = parser.parse_args(argv)
+
+    shift_policy = ShiftPolicy(load_shift_policies(args.shift_policies) if args.shift_policies else None)
+    attendance_data = read_biometric(args.biometric, datetime_formats=dict(args.datetime_formats or []))
+    states = update_month_states(args.state_dir, attendance_data, read_hrms(args.hrms), shift_policy)
+    if not states:
+        parser.error("the HRMS file has no DD-MM-YYYY day columns")
+    for state in states:
+        print(f"{state.year}-{state.month:02d}: {len(state.grid)} employees, "
+              f"days applied {sorted(state.days)}")
+    if args.out:
+        Path(args.out).write_bytes(write_report(states[-1].grid, writer=args.writer).getvalue())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import pandas as pd
+
+from attendance.datetimes import DATETIME_COLUMNS, DatetimeParser, parse_datetimes
+from attendance.schema import BIOMETRIC_COLUMNS, DAY_COLUMN_PATTERN, hrms_column_names, match_biometric_header
+
+BATCH_SIZE = 50_000
+HRMS_CHUNK_ROWS = 50_000
+
+
+def iter_biometric_batches(attendance_file, columns=BIOMETRIC_COLUMNS, batch_size=BATCH_SIZE,
+                           datetime_formats=None):
+    """
+    Stream the biometric Excel export in read-only mode and yield typed
+    DataFrames of at most batch_size rows holding only `columns`.
+
+    `columns` are canonical names (BIOMETRIC_COLUMNS); the header is
+    matched against the known layouts (see attendance.schema), so the
+    single-punch exports of app1.py/app5.py come out in the same shape.
+    Only the requested cells of each row are kept, so peak memory follows
+    the needed columns rather than the width of the device export. One
+    DatetimeParser serves all batches, so text punch formats are detected
+    once per file.
+    """
+    from openpyxl import load_workbook
+
+    parser = DatetimeParser(datetime_formats)
+    workbook = load_workbook(attendance_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("The biometric file is empty")
+        _, layout_positions = match_biometric_header(header)
+        positions = [layout_positions[column] for column in columns]
+
+        batch = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in positions]
+            if all(value is None for value in values):
+                continue
+            batch.append(values)
+            if len(batch) >= batch_size:
+                yield _typed_batch(batch, columns, parser)
+                batch = []
+        if batch:
+            yield _typed_batch(batch, columns, parser)
+    finally:
+        workbook.close()
+
+
+def _typed_batch(batch, columns, parser):
+    frame = pd.DataFrame(batch, columns=columns)
+    parse_datetimes(frame, DATETIME_COLUMNS, parser=parser)
+    if 'Shift_Name' in frame.columns:
+        frame['Shift_Name'] = frame['Shift_Name'].astype('string')
+    return frame
+
+
+def integer_ids(ids):
+    """
+    Convert employee ids to int64 when every id is an integer (or a plain
+    digit string without leading zeros); otherwise keep them unchanged
+    """
+    if pd.api.types.is_integer_dtype(ids):
+        return ids.astype('int64')
+    if pd.api.types.is_float_dtype(ids):
+        if ids.notna().all() and (ids % 1 == 0).all():
+            return ids.astype('int64')
+        return ids
+    text = ids.astype(str)
+    if ids.notna().all() and text.str.fullmatch(r'0|[1-9]\d*').all():
+        return text.astype('int64')
+    return ids
+
+
+def read_biometric(attendance_file, columns=BIOMETRIC_COLUMNS, batch_size=BATCH_SIZE, datetime_formats=None):
+    """
+    Read the biometric export through iter_biometric_batches into a single
+    DataFrame ready for process_attendance: punch columns parsed to
+    datetime64, shift names as a categorical and employee ids through
+    integer_ids.
+    """
+    batches = list(iter_biometric_batches(attendance_file, columns, batch_size, datetime_formats))
+    if not batches:
+        frame = pd.DataFrame({column: pd.Series(dtype=object) for column in columns})
+        for column in DATETIME_COLUMNS:
+            if column in frame.columns:
+                frame[column] = frame[column].astype('datetime64[ns]')
+        return frame
+    frame = pd.concat(batches, ignore_index=True)
+    if 'Shift_Name' in frame.columns:
+        frame['Shift_Name'] = frame['Shift_Name'].astype('category')
+    if 'Employee_ID' in frame.columns:
+        frame['Employee_ID'] = integer_ids(frame['Employee_ID'])
+    return frame
+
+
+def hrms_day_columns(columns):
+    """
+    The DD-MM-YYYY day columns among HRMS column names
+    """
+    return [column for column in columns if DAY_COLUMN_PATTERN.match(str(column))]
+
+
+def share_day_categories(frames):
+    """
+    Give the day columns of every frame one shared categorical dtype whose
+    categories are all day statuses seen in any of them, sorted. Codes then
+    mean the same status in every column and every chunk. Frames are
+    changed in place and the dtype is returned.
+    """
+    categories = set()
+    for frame in frames:
+        for column in hrms_day_columns(frame.columns):
+            if not isinstance(frame[column].dtype, pd.CategoricalDtype):
+                frame[column] = frame[column].astype('category')
+            categories.update(frame[column].cat.categories)
+    dtype = pd.CategoricalDtype(sorted(categories, key=str))
+    for frame in frames:
+        for column in hrms_day_columns(frame.columns):
+            frame[column] = frame[column].cat.set_categories(dtype.categories)
+    return dtype
+
+
+def iter_hrms_chunks(hrms_file, chunk_rows=HRMS_CHUNK_ROWS):
+    """
+    Read the HRMS CSV in chunks of at most chunk_rows employees.
+
+    The day columns are found from the header alone and parsed straight to
+    categoricals, so no chunk holds them as per-cell strings. Each chunk
+    has its own categories; read_hrms puts them on a shared dtype. The
+    identity columns are renamed to 'Employee Id'/'Employee Name'; a
+    header without them or without day columns raises ValueError.
+    """
+    header = pd.read_csv(hrms_file, nrows=0)
+    if hasattr(hrms_file, 'seek'):
+        hrms_file.seek(0)
+    renames = hrms_column_names(header.columns)
+    dtype = {column: 'category' for column in hrms_day_columns(header.columns)}
+    with pd.read_csv(hrms_file, dtype=dtype, chunksize=chunk_rows) as chunks:
+        for chunk in chunks:
+            yield chunk.rename(columns=renames)
+
+
+def read_hrms(hrms_file, chunk_rows=HRMS_CHUNK_ROWS):
+    """
+    Read the HRMS CSV through iter_hrms_chunks into a single DataFrame whose
+    day columns share one categorical dtype (see share_day_categories) and
+    whose employee ids went through integer_ids
+    """
+    chunks = list(iter_hrms_chunks(hrms_file, chunk_rows))
+    if not chunks:
+        if hasattr(hrms_file, 'seek'):
+            hrms_file.seek(0)
+        chunks = [pd.read_csv(hrms_file, nrows=0).rename(columns=hrms_column_names)]
+    share_day_categories(chunks)
+    hrms_data = pd.concat(chunks, ignore_index=True)
+    hrms_data['Employee Id'] = integer_ids(hrms_data['Employee Id'])
+    return hrms_data
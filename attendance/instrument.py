@@ -0,0 +1,85 @@
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+logger = logging.getLogger('attendance.stages')
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far in MB, or None where
+    the resource module is missing
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class StageTimer:
+    """
+    Records wall time, the process's peak RSS and row counts per pipeline
+    stage and writes one JSON log line per stage to the 'attendance.stages'
+    logger.
+
+    rss_mb is the process-wide high-water mark after the stage, so it
+    only grows and also covers concurrent runs. track_memory=True adds
+    peak_mb, the stage's peak traced allocation: tracemalloc is started
+    for the stage and stopped after it, which slows the stage several
+    times over and is process-global, so it is meant for single-run
+    measurements such as the benchmark, not for the app.
+    """
+
+    def __init__(self, run_id=None, track_memory=False):
+        self.run_id = run_id
+        self.track_memory = track_memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+        record = {'stage': name, 'rows': rows}
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - started, 4)
+            record['rss_mb'] = peak_rss_mb()
+            if self.track_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                record['peak_mb'] = round(max(peak - baseline, 0) / (1024 * 1024), 2)
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(record)
+            logger.info(json.dumps({'run_id': self.run_id, **record}, default=str))
+
+    def total_seconds(self):
+        return round(sum(record['seconds'] for record in self.stages), 4)
+
+    def as_rows(self):
+        return [dict(record) for record in self.stages]
+
+
+def timed(timer, name, rows=None):
+    """
+    timer.stage(name, rows), or a no-op context when timer is None. The
+    context yields a dict whose 'rows' entry can be filled in afterwards.
+    """
+    if timer is None:
+        return nullcontext({})
+    return timer.stage(name, rows)
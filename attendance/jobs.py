@@ -0,0 +1,101 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class Job:
+    """
+    One background run. The worker function receives the job and reports
+    through job.update(); its return value becomes job.result.
+    """
+
+    def __init__(self, key=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.stage = 'Queued'
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.info = {}
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    def update(self, stage=None, done=None, total=None):
+        if stage is not None:
+            self.stage = stage
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+
+
+class JobPool:
+    """
+    Runs jobs on a thread pool shared by every session of the app.
+
+    Jobs are kept for keep_seconds after they finish, so a rerun or a
+    reconnecting browser can fetch the result by id. Submitting a key that
+    already has a queued, running or finished job returns that job instead
+    of starting the same work again; failed jobs are replaced. on_expire,
+    if given, is called with each job dropped after keep_seconds.
+    """
+
+    def __init__(self, max_workers=4, keep_seconds=3600, on_expire=None):
+        self.keep_seconds = keep_seconds
+        self.on_expire = on_expire
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='attendance-job')
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, key=None):
+        with self._lock:
+            self._expire()
+            existing = self._jobs.get(self._by_key.get(key)) if key is not None else None
+            if existing is not None and existing.status != FAILED:
+                return existing
+            job = Job(key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, func):
+        job.status = RUNNING
+        job.update(stage='Starting')
+        try:
+            job.result = func(job)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _expire(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) == job_id:
+                    del self._by_key[job.key]
+                if self.on_expire is not None:
+                    self.on_expire(job)
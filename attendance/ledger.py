@@ -0,0 +1,236 @@
+"""
+Local SQLite ledger of processed months, for year-to-date and date range
+questions without re-reading source files or old workbooks.
+
+Every processed month is loaded from its report StatusGrid: one `days`
+row per non-empty employee-day and one `months` row per employee with the
+month's counters. Loading a month again replaces the days it covers.
+"""
+import sqlite3
+import time
+from calendar import monthrange
+
+import numpy as np
+import pandas as pd
+
+from attendance.grid import EMPTY
+
+LATE = 'Late'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    employee_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    late_label TEXT,
+    late_minutes INTEGER,
+    PRIMARY KEY (employee_id, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS days_status_date ON days (status, date, late_label);
+CREATE TABLE IF NOT EXISTS months (
+    employee_id TEXT NOT NULL,
+    employee_name TEXT,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    late_count INTEGER,
+    pl_count INTEGER,
+    cl_count INTEGER,
+    ll_count INTEGER,
+    lwp_count INTEGER,
+    worked_hours REAL,
+    loaded_at REAL,
+    PRIMARY KEY (employee_id, year, month)
+);
+"""
+MONTH_COUNT_COLUMNS = {
+    'Late Count': 'late_count',
+    'PL Count': 'pl_count',
+    'CL Count': 'cl_count',
+    'LL Count': 'll_count',
+    'LWP Count': 'lwp_count',
+    'Worked Hours': 'worked_hours',
+}
+
+
+def connect(path):
+    """
+    Open (creating if needed) the ledger at path
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def employee_rows(grid):
+    """
+    (grid rows, employee ids as text) of the employees a StatusGrid loads
+    into the ledger. Blank ids are skipped and a repeated id keeps its
+    last row, so one id is one ledger employee. Whole-number float ids
+    (an id column with blank rows reads as float) are written as integers.
+    """
+    ids = pd.Series(grid.employee_ids, dtype=object)
+    ids = ids[ids.notna()].map(lambda value: str(int(value)) if isinstance(value, float) and value.is_integer()
+                               else str(value))
+    ids = ids[(ids.str.strip() != '') & ~ids.duplicated(keep='last')]
+    return ids.index.to_numpy(), ids.tolist()
+
+
+def day_rows(grid, year, month, rows=None):
+    """
+    (employee_id, date, status, late_label, late_minutes) for every
+    non-empty day cell of a month's StatusGrid, read from its codes. Late
+    cells get status 'Late', their shift label and the punch-in as
+    minutes after midnight (the grid's late_minutes). `rows` are the grid
+    rows to load, default employee_rows(grid).
+    """
+    keep, ids = employee_rows(grid) if rows is None else rows
+    rows, columns = np.nonzero(grid.codes[keep] != EMPTY)
+    codes = grid.codes[keep][rows, columns]
+    labels = np.array([None if label is None else str(label) for label in grid.labels], dtype=object)
+    is_late = np.asarray(grid.late, dtype=bool)[codes]
+    status = labels[codes]
+    late_label = np.where(is_late, status, None)
+    status[is_late] = LATE
+    late_minutes = np.full(len(codes), None, dtype=object)
+    late_minutes[is_late] = grid.late_minutes[keep[rows[is_late]], columns[is_late]].tolist()
+    dates = np.array([f'{year}-{month:02d}-{day:02d}' for day in range(1, grid.days_in_month + 1)], dtype=object)
+    return zip(
+        np.array(ids, dtype=object)[rows].tolist(),
+        dates[columns].tolist(),
+        status.tolist(),
+        late_label.tolist(),
+        late_minutes.tolist(),
+    )
+
+
+def record_month(conn, grid, year, month):
+    """
+    Replace the ledger's rows of the grid's employees (employee_rows) for
+    the days of year/month that the report StatusGrid covers
+    (grid.attrs['days'], default every day) with the grid's. Other
+    employees, such as another branch's, are left alone. The `months`
+    counters are only replaced when the grid covers the whole month; a
+    date range over part of a month leaves them, and the month's other
+    days, as they were. Returns the number of day rows written.
+    """
+    days = grid.attrs.get('days', range(1, grid.days_in_month + 1))
+    dates = [f'{year}-{month:02d}-{day:02d}' for day in days]
+    full_month = len(dates) == monthrange(year, month)[1]
+    keep, ids = employee_rows(grid)
+    counts = grid.summary_columns()
+    month_rows = zip(ids, map(str, np.asarray(grid.employee_names, dtype=object)[keep]),
+                     [year] * len(ids), [month] * len(ids),
+                     *(np.asarray(counts.get(column, np.zeros(len(grid))))[keep].tolist()
+                       for column in MONTH_COUNT_COLUMNS),
+                     [time.time()] * len(ids))
+    with conn:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS loading (employee_id TEXT PRIMARY KEY)')
+        conn.execute('DELETE FROM loading')
+        conn.executemany('INSERT INTO loading VALUES (?)', ((employee_id,) for employee_id in ids))
+        if dates:
+            conn.execute('DELETE FROM days WHERE employee_id IN (SELECT employee_id FROM loading) '
+                         f'AND date IN ({", ".join("?" * len(dates))})', dates)
+        if full_month:
+            conn.execute('DELETE FROM months WHERE employee_id IN (SELECT employee_id FROM loading) '
+                         'AND year = ? AND month = ?', (year, month))
+            conn.executemany(f'INSERT INTO months VALUES ({", ".join("?" * 11)})', month_rows)
+        cursor = conn.executemany('INSERT INTO days VALUES (?, ?, ?, ?, ?)', day_rows(grid, year, month, (keep, ids)))
+    # Sampled statistics (about a millisecond) keep the date range queries
+    # choosing between the primary key and the status index
+    conn.execute('PRAGMA analysis_limit=400')
+    conn.execute('ANALYZE')
+    return cursor.rowcount
+
+
+def record_sheets(path, sheets):
+    """
+    Load every month sheet of a report ({sheet name: StatusGrid or
+    DataFrame}) into the ledger at path. Month sheets are the StatusGrids
+    carrying their (year, month) in attrs['period']; other sheets (Totals)
+    are skipped. Returns {(year, month): day rows}.
+    """
+    conn = connect(path)
+    try:
+        return {
+            grid.attrs['period']: record_month(conn, grid, *grid.attrs['period'])
+            for grid in sheets.values() if 'period' in grid.attrs
+        }
+    finally:
+        conn.close()
+
+
+def _date(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def year_to_date(today=None):
+    """
+    (first day of the year, today)
+    """
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.today()
+    return today.replace(month=1, day=1).normalize(), today.normalize()
+
+
+def status_counts(conn, start, end, employee_id=None, statuses=None):
+    """
+    Days per employee and status between start and end (inclusive), as a
+    DataFrame of employee_id, status, days
+    """
+    query = 'SELECT employee_id, status, COUNT(*) AS days FROM days WHERE date BETWEEN ? AND ?'
+    params = [_date(start), _date(end)]
+    if employee_id is not None:
+        query += ' AND employee_id = ?'
+        params.append(str(employee_id))
+    if statuses:
+        query += f' AND status IN ({", ".join("?" * len(statuses))})'
+        params.extend(statuses)
+    query += ' GROUP BY employee_id, status ORDER BY employee_id, status'
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def late_counts(conn, start, end):
+    """
+    Late days and distinct late employees per shift label between start
+    and end (inclusive)
+    """
+    return pd.read_sql_query(
+        'SELECT late_label, COUNT(*) AS days, COUNT(DISTINCT employee_id) AS employees FROM days '
+        'WHERE status = ? AND date BETWEEN ? AND ? GROUP BY late_label ORDER BY late_label',
+        conn, params=[LATE, _date(start), _date(end)])
+
+
+def employee_days(conn, employee_id, start, end):
+    """
+    Every ledger day of one employee between start and end (inclusive)
+    """
+    return pd.read_sql_query(
+        'SELECT date, status, late_label, late_minutes FROM days '
+        'WHERE employee_id = ? AND date BETWEEN ? AND ? ORDER BY date',
+        conn, params=[str(employee_id), _date(start), _date(end)])
+
+
+def month_totals(conn, start, end, employee_id=None):
+    """
+    Late/leave counters and worked hours per employee summed over the
+    whole months from start to end, read from the `months` table rather
+    than the individual days
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    sums = ', '.join(f'SUM({column}) AS {column}' for column in MONTH_COUNT_COLUMNS.values())
+    query = (f'SELECT employee_id, MAX(employee_name) AS employee_name, {sums} FROM months '
+             'WHERE year * 100 + month BETWEEN ? AND ?')
+    params = [start.year * 100 + start.month, end.year * 100 + end.month]
+    if employee_id is not None:
+        query += ' AND employee_id = ?'
+        params.append(str(employee_id))
+    return pd.read_sql_query(query + ' GROUP BY employee_id ORDER BY employee_id', conn, params=params)
+
+
+def recorded_months(conn):
+    """
+    (year, month, employees) of every month in the ledger
+    """
+    return pd.read_sql_query('SELECT year, month, COUNT(*) AS employees FROM months GROUP BY year, month '
+                             'ORDER BY year, month', conn)
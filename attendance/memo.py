@@ -0,0 +1,151 @@
+"""
+Per-employee memo of classified report rows, so a re-upload with a few
+corrected HRMS codes reclassifies only the employees whose inputs changed.
+
+An employee's key combines a hash of their HRMS row (id, name and the
+month's day columns) with a hash of their punch records for the month,
+under a context of the month and the shift policy. Rows whose key is in
+the memo are copied from it; the rest are classified as usual and stored.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from attendance.cache import content_hash
+from attendance.engine import classify_attendance, day_columns
+from attendance.grid import StatusGrid
+from attendance.parallel import classify_parallel
+from attendance.punch_index import INDEX_KEYS, RECORD_COLUMNS
+from attendance.shifts import ShiftPolicy
+
+MEMO_MAX_ENTRIES = 500_000
+
+
+class EmployeeMemo:
+    """
+    Thread-safe LRU memo of per-employee grid rows, bounded by the number
+    of employee-months it holds.
+
+    Day codes are stored in the memo's own label vocabulary (an empty
+    StatusGrid), so rows classified by different grids can be mixed and
+    translated into any new grid.
+    """
+
+    def __init__(self, max_entries=MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.vocabulary = StatusGrid((), (), 0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, keys, grid):
+        """
+        Copy the memoized rows of `keys` (one per grid row) into grid and
+        return the positions that were not in the memo
+        """
+        with self._lock:
+            found = [(row, self._entries.get(key)) for row, key in enumerate(keys)]
+            found = [(row, entry) for row, entry in found if entry is not None]
+            for row, _ in found:
+                self._entries.move_to_end(keys[row])
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            translate = grid.translate(self.vocabulary)
+        if found:
+            rows = np.array([row for row, _ in found], dtype=np.int64)
+            cells = np.stack([entry for _, entry in found])
+            grid.codes[rows] = translate[cells[:, 0]]
+            grid.late_minutes[rows] = cells[:, 1]
+            grid.worked_minutes[rows] = cells[:, 2]
+        missing = np.ones(len(keys), dtype=bool)
+        missing[[row for row, _ in found]] = False
+        return np.flatnonzero(missing)
+
+    def store(self, keys, grid):
+        """
+        Memoize every row of grid under the matching key
+        """
+        with self._lock:
+            # One (3, days) uint16 array per employee: codes, late and worked minutes
+            cells = np.stack([self.vocabulary.translate(grid)[grid.codes].astype(np.uint16), grid.late_minutes,
+                              grid.worked_minutes], axis=1)
+            for row, key in enumerate(keys):
+                self._entries[key] = cells[row].copy()
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _combine(codes, hashes, n_groups):
+    """
+    Order-independent uint64 sum of hashes per group code (wrapping)
+    """
+    sums = np.zeros(n_groups, dtype=np.uint64)
+    np.add.at(sums, codes, hashes)
+    return sums
+
+
+def employee_keys(punch_index, hrms_data, month, year, days_in_month, shift_policy=None):
+    """
+    One memo key per HRMS row: (context, HRMS row hash, punch hash), where
+    the punch hash covers the employee's punch records of the month
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    columns = [column for column in day_columns(month, year, days_in_month) if column in hrms_data.columns]
+    context = content_hash('employee-memo', str(year), str(month), str(days_in_month), shift_policy.cache_key(),
+                           *columns)
+    hrms_hashes = hash_pandas_object(hrms_data[['Employee Id', 'Employee Name'] + columns], index=False)
+
+    dates = punch_index.index.get_level_values(INDEX_KEYS[1])
+    in_month = (dates.year == year) & (dates.month == month)
+    records = punch_index.loc[in_month, RECORD_COLUMNS].reset_index()
+    employee_codes, employees = pd.factorize(records[INDEX_KEYS[0]])
+    record_hashes = hash_pandas_object(records, index=False).to_numpy()
+    punch_hashes = pd.Series(_combine(employee_codes, record_hashes, len(employees)), index=employees)
+    punch_hashes = punch_hashes.reindex(hrms_data['Employee Id'].to_numpy(), fill_value=0)
+
+    return [(context, int(hrms_hash), int(punch_hash))
+            for hrms_hash, punch_hash in zip(hrms_hashes.to_numpy(), punch_hashes.to_numpy())]
+
+
+def classify_memoized(memo, punch_index, hrms_data, month, year, days_in_month, shift_policy=None, workers=1,
+                      progress=None):
+    """
+    classify_attendance through the memo: returns (grid, rows recomputed).
+    Only employees missing from the memo are classified (on `workers`
+    processes, see classify_parallel) and then memoized.
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    keys = employee_keys(punch_index, hrms_data, month, year, days_in_month, shift_policy)
+    grid = StatusGrid(hrms_data['Employee Id'], hrms_data['Employee Name'], days_in_month,
+                      late_labels=shift_policy.labels[:-1], worked_hours=True)
+    missing = memo.lookup(keys, grid)
+    reused = len(keys) - len(missing)
+    if progress is not None:
+        progress(reused, len(keys))
+
+    if len(missing):
+        def shard_progress(done, total):
+            if progress is not None:
+                progress(reused + done, len(keys))
+
+        changed = hrms_data.iloc[missing]
+        if workers == 1:
+            update = classify_attendance(punch_index, changed, month, year, days_in_month, shift_policy,
+                                         progress=shard_progress)
+        else:
+            update = classify_parallel(punch_index, changed, month, year, days_in_month, shift_policy,
+                                       workers=workers, progress=shard_progress)
+        grid.codes[missing] = grid.translate(update)[update.codes]
+        grid.late_minutes[missing] = update.late_minutes
+        grid.worked_minutes[missing] = update.worked_minutes
+        memo.store([keys[row] for row in missing], update)
+    grid.recount()
+    return grid, len(missing)
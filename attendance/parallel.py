@@ -0,0 +1,178 @@
+"""
+Classify HRMS employees on several cores.
+
+The punch index and the HRMS day codes are copied once into shared
+memory as plain numeric arrays. Each worker process attaches to them
+when it starts and rebuilds its own punch index from them. Tasks are
+only (start, stop) row ranges of the HRMS data, so nothing is pickled
+per task except the small grid each shard returns. The shard grids are
+stitched back in HRMS order.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from attendance.engine import classify_attendance, day_columns, day_status_codes
+from attendance.grid import StatusGrid
+from attendance.punch_index import INDEX_KEYS, RECORD_COLUMNS
+from attendance.shifts import ShiftPolicy
+
+# Shards per worker: enough that one slow shard does not leave the other
+# cores idle, few enough that each still classifies whole blocks
+SHARDS_PER_WORKER = 4
+# Below this many employees the pool costs more than it saves
+MIN_PARALLEL_ROWS = 5000
+
+# Set in each worker process by _init_worker
+_worker = {}
+
+
+class SharedArrays:
+    """
+    Numpy arrays copied into named shared memory blocks. `spec` is the
+    picklable description another process passes to attach().
+    """
+
+    def __init__(self, arrays):
+        self.blocks = []
+        self.spec = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec):
+    """
+    ({name: array view}, blocks) for a SharedArrays spec. Keep the blocks
+    referenced for as long as the arrays are used.
+    """
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in spec.items():
+        # Workers share the creating process's resource tracker, which
+        # unlinks the block once when SharedArrays.close() runs
+        block = shared_memory.SharedMemory(name=block_name)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        blocks.append(block)
+    return arrays, blocks
+
+
+def shared_inputs(punch_index, hrms_data, month, year, days_in_month):
+    """
+    The numeric arrays a worker needs, plus the HRMS day statuses.
+
+    Employee ids of both sides are replaced by one integer code each, so
+    ids of any type can go into shared memory and still match exactly as
+    they would in the punch index lookup.
+    """
+    punch_ids = punch_index.index.get_level_values(INDEX_KEYS[0])
+    employee_codes, _ = pd.factorize(np.concatenate([hrms_data['Employee Id'].to_numpy(dtype=object),
+                                                     punch_ids.to_numpy(dtype=object)]))
+    columns = [column for column in day_columns(month, year, days_in_month) if column in hrms_data.columns]
+    day_codes, categories = day_status_codes(hrms_data, columns)
+    arrays = {
+        'hrms_ids': employee_codes[:len(hrms_data)],
+        'day_codes': day_codes,
+        'punch_ids': employee_codes[len(hrms_data):],
+        'punch_dates': punch_index.index.get_level_values(INDEX_KEYS[1]).to_numpy(dtype='datetime64[ns]'),
+    }
+    for column in RECORD_COLUMNS:
+        arrays[column] = punch_index[column].to_numpy()
+    return arrays, columns, categories
+
+
+def _init_worker(spec, columns, categories, month, year, days_in_month, shift_policy):
+    arrays, blocks = attach(spec)
+    index = pd.MultiIndex.from_arrays([arrays['punch_ids'], arrays['punch_dates']], names=INDEX_KEYS)
+    _worker.update(
+        arrays=arrays,
+        blocks=blocks,
+        punch_index=pd.DataFrame({column: arrays[column] for column in RECORD_COLUMNS}, index=index),
+        columns=columns,
+        categories=categories,
+        period=(month, year, days_in_month),
+        shift_policy=shift_policy,
+    )
+
+
+def _classify_shard(start, stop):
+    """
+    Worker: StatusGrid of HRMS rows [start, stop)
+    """
+    arrays = _worker['arrays']
+    hrms_data = pd.DataFrame({'Employee Id': arrays['hrms_ids'][start:stop]})
+    # Names are filled in from the full HRMS data when the shards are stitched
+    hrms_data['Employee Name'] = ''
+    for i, column in enumerate(_worker['columns']):
+        hrms_data[column] = pd.Categorical.from_codes(arrays['day_codes'][start:stop, i],
+                                                      categories=_worker['categories'])
+    month, year, days_in_month = _worker['period']
+    grid = classify_attendance(_worker['punch_index'], hrms_data, month, year, days_in_month,
+                               _worker['shift_policy'])
+    # Only the cell arrays and label vocabulary travel back
+    grid.employee_ids = grid.employee_names = None
+    grid.counts = {}
+    return start, grid
+
+
+def shard_bounds(n_rows, workers):
+    """
+    (start, stop) HRMS row ranges, SHARDS_PER_WORKER per worker
+    """
+    n_shards = max(1, min(n_rows, workers * SHARDS_PER_WORKER))
+    edges = np.linspace(0, n_rows, n_shards + 1).astype(int)
+    return [(start, stop) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+def classify_parallel(punch_index, hrms_data, month, year, days_in_month, shift_policy=None, workers=None,
+                      progress=None):
+    """
+    classify_attendance on `workers` processes (default: CPU count); the
+    returned grid is the same as the single-process one. Small inputs and
+    workers=1 run in this process. progress(employees done, total) is
+    called as shards finish.
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    workers = workers or os.cpu_count() or 1
+    n_rows = len(hrms_data)
+    if workers == 1 or n_rows < MIN_PARALLEL_ROWS:
+        return classify_attendance(punch_index, hrms_data, month, year, days_in_month, shift_policy,
+                                   progress=progress)
+
+    grid = StatusGrid(hrms_data['Employee Id'], hrms_data['Employee Name'], days_in_month,
+                      late_labels=shift_policy.labels[:-1], worked_hours=True)
+    arrays, columns, categories = shared_inputs(punch_index, hrms_data, month, year, days_in_month)
+    done = 0
+    with SharedArrays(arrays) as shared, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(shared.spec, columns, categories, month, year, days_in_month,
+                                          shift_policy)) as pool:
+        futures = [pool.submit(_classify_shard, start, stop) for start, stop in shard_bounds(n_rows, workers)]
+        for future in as_completed(futures):
+            start, shard = future.result()
+            rows = slice(start, start + len(shard.codes))
+            grid.codes[rows] = grid.translate(shard)[shard.codes]
+            grid.late_minutes[rows] = shard.late_minutes
+            grid.worked_minutes[rows] = shard.worked_minutes
+            done += len(shard.codes)
+            if progress is not None:
+                progress(done, n_rows)
+    grid.recount()
+    return grid
@@ -0,0 +1,89 @@
+from calendar import monthrange
+
+import pandas as pd
+
+from attendance.datetimes import DATETIME_COLUMNS, parse_datetimes
+from attendance.engine import classify_attendance, day_columns
+from attendance.instrument import timed
+from attendance.memo import classify_memoized
+from attendance.parallel import classify_parallel
+from attendance.punch_index import build_punch_index
+from attendance.shifts import ShiftPolicy
+
+
+def prepare_punches(attendance_data, datetime_formats=None):
+    """
+    Parse the biometric punch columns in place. `datetime_formats` maps a
+    column to its strftime format; columns without one are detected.
+    """
+    return parse_datetimes(attendance_data, DATETIME_COLUMNS, datetime_formats)
+
+
+def report_period(attendance_data):
+    """
+    Return (month, year, days_in_month) of the earliest valid punch date
+    """
+    first_date = attendance_data['Punch_Date'].min()
+    if pd.isna(first_date):
+        raise ValueError("No valid dates found in attendance data")
+    month = first_date.month
+    year = first_date.year
+    _, days_in_month = monthrange(year, month)
+    return month, year, days_in_month
+
+
+def build_month_report(attendance_data, hrms_data, month, year, shift_policy=None, timer=None, progress=None,
+                       workers=1, memo=None):
+    """
+    Classify one month from already prepared punches and return the report
+    StatusGrid; its text is only rendered by the writers. `shift_policy` is a ShiftPolicy (default policies when None),
+    `timer` an optional StageTimer and `progress` an optional
+    progress(employees done, total) callback. workers > 1 (None for the CPU
+    count) classifies shards of employees on that many processes. With an
+    EmployeeMemo only employees whose HRMS row or punches changed since
+    they were memoized are classified. The grid's attrs hold 'period',
+    (year, month), 'days', the days of the month with an HRMS column, and
+    'recomputed', the number of employees classified.
+    """
+    _, days_in_month = monthrange(year, month)
+    shift_policy = shift_policy or ShiftPolicy()
+
+    # Index punches by (employee, date) once for the whole upload
+    with timed(timer, 'punch_index', rows=len(attendance_data)):
+        punch_index = build_punch_index(attendance_data, shift_policy)
+
+    # Classify every employee-day in one pass over the long-form HRMS data
+    with timed(timer, 'classify', rows=len(hrms_data) * days_in_month) as record:
+        recomputed = len(hrms_data)
+        if memo is not None:
+            grid, recomputed = classify_memoized(memo, punch_index, hrms_data, month, year, days_in_month,
+                                                 shift_policy, workers=workers, progress=progress)
+        elif workers == 1:
+            grid = classify_attendance(punch_index, hrms_data, month, year, days_in_month, shift_policy,
+                                       progress=progress)
+        else:
+            grid = classify_parallel(punch_index, hrms_data, month, year, days_in_month, shift_policy,
+                                     workers=workers, progress=progress)
+        record['workers'] = workers
+        record['recomputed'] = recomputed
+
+    # Lets the ledger and other consumers tell which month a sheet holds
+    grid.attrs['period'] = (year, month)
+    grid.attrs['days'] = [day for day, column in enumerate(day_columns(month, year, days_in_month), start=1)
+                          if column in hrms_data.columns]
+    grid.attrs['recomputed'] = recomputed
+    return grid
+
+
+def build_report(attendance_data, hrms_data, shift_policy=None, timer=None, datetime_formats=None, progress=None,
+                 workers=1, memo=None):
+    """
+    Run the whole classification for one biometric/HRMS pair and return the
+    report StatusGrid. Raises ValueError when the punches have no valid date.
+    See build_month_report for `workers` and `memo`.
+    """
+    with timed(timer, 'parse_datetimes', rows=len(attendance_data)):
+        prepare_punches(attendance_data, datetime_formats)
+    month, year, _ = report_period(attendance_data)
+    return build_month_report(attendance_data, hrms_data, month, year, shift_policy=shift_policy, timer=timer,
+                              progress=progress, workers=workers, memo=memo)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from attendance.shifts import ShiftPolicy, minutes_since_midnight
+
+INDEX_KEYS = ['Employee_ID', 'Punch_Date']
+RECORD_COLUMNS = ['Punch_In_Time', 'Punch_Out_Time', 'Punch_Count', 'Worked_Minutes', 'In_Minutes', 'Shift_Code',
+                  'Late']
+NAT = np.iinfo(np.int64).min
+
+
+def aggregate_punch_days(records):
+    """
+    Collapse biometric rows to one row per (Employee_ID, Punch_Date).
+
+    The rows are sorted once (stable, so file order is kept within a day)
+    and each day is reduced in one pass: earliest Punch_In_Time, latest
+    Punch_Out_Time, the number of rows (Punch_Count) and Worked_Minutes,
+    the summed length of the rows that have both punches. Shift_Name is
+    taken from the day's first row.
+    """
+    employee_codes, _ = pd.factorize(records['Employee_ID'])
+    dates = records['Punch_Date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    order = np.lexsort((dates, employee_codes))
+    employee_codes, dates = employee_codes[order], dates[order]
+    punch_in = records['Punch_In_Time'].to_numpy(dtype='datetime64[ns]')[order].view(np.int64)
+    punch_out = records['Punch_Out_Time'].to_numpy(dtype='datetime64[ns]')[order].view(np.int64)
+
+    new_day = np.ones(len(order), dtype=bool)
+    new_day[1:] = (employee_codes[1:] != employee_codes[:-1]) | (dates[1:] != dates[:-1])
+    starts = np.flatnonzero(new_day)
+    if len(starts) == 0:
+        aggregated = records.iloc[:0][['Employee_ID', 'Punch_Date', 'Punch_In_Time', 'Punch_Out_Time', 'Shift_Name']]
+        return aggregated.assign(Punch_Count=np.int32(0), Worked_Minutes=np.uint16(0))
+
+    # NaT is the smallest int64, so it never wins a maximum; for the minimum
+    # it is swapped for the largest value first
+    earliest_in = np.minimum.reduceat(np.where(punch_in == NAT, np.iinfo(np.int64).max, punch_in), starts)
+    earliest_in[earliest_in == np.iinfo(np.int64).max] = NAT
+    latest_out = np.maximum.reduceat(punch_out, starts)
+
+    complete = (punch_in != NAT) & (punch_out != NAT)
+    seconds = np.where(complete, np.maximum(punch_out - punch_in, 0) // 1_000_000_000, 0)
+    worked_minutes = np.add.reduceat(seconds, starts) // 60
+
+    first_rows = records.iloc[order[starts]]
+    return pd.DataFrame({
+        'Employee_ID': first_rows['Employee_ID'].to_numpy(),
+        'Punch_Date': first_rows['Punch_Date'].to_numpy(),
+        'Punch_In_Time': earliest_in.view('datetime64[ns]'),
+        'Punch_Out_Time': latest_out.view('datetime64[ns]'),
+        'Shift_Name': first_rows['Shift_Name'].to_numpy(),
+        'Punch_Count': np.diff(np.append(starts, len(order))).astype(np.int32),
+        'Worked_Minutes': np.minimum(worked_minutes, np.iinfo(np.uint16).max).astype(np.uint16),
+    })
+
+
+def build_punch_index(attendance_data, shift_policy=None):
+    """
+    Build the (Employee_ID, date) -> punch record index once per upload.
+
+    Expects Punch_Date/Punch_In_Time/Punch_Out_Time already parsed. Each
+    record aggregates all biometric rows of the employee and date (see
+    aggregate_punch_days): the earliest punch-in and latest punch-out decide
+    the status. Each record also carries the punch-in as integer minutes
+    since midnight, the shift's code in shift_policy (a ShiftPolicy,
+    default policies when None) and the late flag, all computed for every
+    record in one array pass.
+    """
+    shift_policy = shift_policy or ShiftPolicy()
+    valid = attendance_data['Punch_Date'].notna() & attendance_data['Employee_ID'].notna()
+    records = attendance_data.loc[valid, ['Employee_ID', 'Punch_In_Time', 'Punch_Out_Time', 'Shift_Name']].copy()
+    records['Punch_Date'] = attendance_data.loc[valid, 'Punch_Date'].dt.normalize().astype('datetime64[ns]')
+    records = aggregate_punch_days(records)
+
+    records['In_Minutes'] = minutes_since_midnight(records['Punch_In_Time'])
+    records['Shift_Code'] = shift_policy.shift_codes(records['Shift_Name'])
+    records['Late'] = shift_policy.late_flags(records['Shift_Code'].to_numpy(), records['In_Minutes'].to_numpy())
+    return records.set_index(INDEX_KEYS)[RECORD_COLUMNS]
+
+
+def lookup_punches(punch_index, employee_ids, dates):
+    """
+    Return one punch record per (employee_id, date) pair, aligned with the
+    inputs. Pairs without a biometric record come back with missing punch
+    times, In_Minutes and Shift_Code of -1, zero Punch_Count and
+    Worked_Minutes and Late False.
+    """
+    keys = pd.MultiIndex.from_arrays(
+        [employee_ids, pd.DatetimeIndex(dates).astype('datetime64[ns]')], names=INDEX_KEYS
+    )
+    punches = punch_index.reindex(keys)
+    punches['In_Minutes'] = punches['In_Minutes'].fillna(-1).to_numpy(dtype=np.int16)
+    punches['Shift_Code'] = punches['Shift_Code'].fillna(-1).to_numpy(dtype=np.int8)
+    punches['Late'] = punches['Late'].fillna(False).to_numpy(dtype=bool)
+    punches['Punch_Count'] = punches['Punch_Count'].fillna(0).to_numpy(dtype=np.int32)
+    punches['Worked_Minutes'] = punches['Worked_Minutes'].fillna(0).to_numpy(dtype=np.uint16)
+    return punches
@@ -0,0 +1,119 @@
+from calendar import month_abbr
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from attendance.engine import day_columns
+from attendance.instrument import timed
+from attendance.pipeline import build_month_report, prepare_punches
+
+TOTALS_SHEET = 'Totals'
+TOTAL_COLUMNS = ['Late Count', 'Leaves Count', 'PL Count', 'CL Count', 'LL Count', 'LWP Count', 'Worked Hours']
+
+
+def months_in_range(start, end):
+    """
+    Return every (year, month) from start to end inclusive
+    """
+    periods = pd.period_range(pd.Timestamp(start).to_period('M'), pd.Timestamp(end).to_period('M'), freq='M')
+    return [(period.year, period.month) for period in periods]
+
+
+def month_partitions(attendance_data, hrms_data, start=None, end=None, shift_policy=None):
+    """
+    Split prepared punches and HRMS day columns into one partition per month.
+
+    Without start/end the range runs from the earliest to the latest valid
+    punch date. HRMS day columns outside [start, end] are dropped, so days
+    outside the range stay blank and are not counted.
+    """
+    punch_dates = attendance_data['Punch_Date']
+    start = pd.Timestamp(start).normalize() if start is not None else punch_dates.min()
+    end = pd.Timestamp(end).normalize() if end is not None else punch_dates.max()
+    if pd.isna(start) or pd.isna(end):
+        raise ValueError("No valid dates found in attendance data")
+    if start > end:
+        raise ValueError("The start of the date range is after its end")
+    start, end = start.normalize(), end.normalize()
+
+    partitions = []
+    for year, month in months_in_range(start, end):
+        in_month = (punch_dates.dt.month == month) & (punch_dates.dt.year == year)
+        period = pd.Period(year=year, month=month, freq='M')
+        days = day_columns(month, year, period.days_in_month)
+        keep = [
+            column for day, column in enumerate(days, start=1)
+            if column in hrms_data.columns and start <= pd.Timestamp(year, month, day) <= end
+        ]
+        partitions.append({
+            'year': year,
+            'month': month,
+            'attendance_data': attendance_data.loc[in_month],
+            'hrms_data': hrms_data[['Employee Id', 'Employee Name'] + keep],
+            'shift_policy': shift_policy,
+        })
+    return partitions
+
+
+def _build_partition(partition):
+    return build_month_report(partition['attendance_data'], partition['hrms_data'],
+                              partition['month'], partition['year'], partition['shift_policy'])
+
+
+def sheet_name(year, month):
+    return f'{month_abbr[month]} {year}'
+
+
+def totals_frame(hrms_data, month_reports):
+    """
+    Sum the late and leave counters and worked hours of every month's
+    StatusGrid per HRMS employee
+    """
+    totals = pd.DataFrame({
+        'Employee Id': hrms_data['Employee Id'].to_numpy(),
+        'Employee Name': hrms_data['Employee Name'].to_numpy(),
+    })
+    for column in TOTAL_COLUMNS:
+        totals[column] = sum((report.summary_columns()[column] for report in month_reports), start=0)
+    totals['Worked Hours'] = totals['Worked Hours'].round(2)
+    return totals
+
+
+def _collect(reports, rows_per_month, total, progress):
+    month_reports = []
+    for report in reports:
+        month_reports.append(report)
+        if progress is not None:
+            progress(len(month_reports) * rows_per_month, total)
+    return month_reports
+
+
+def build_range_report(attendance_data, hrms_data, start=None, end=None, workers=None, shift_policy=None,
+                       timer=None, progress=None):
+    """
+    Classify every month between start and end concurrently from a single
+    parse of the inputs. Returns {sheet name: report} with one StatusGrid
+    per month followed by the consolidated totals DataFrame. `progress` is called
+    with (employee-months done, total) as each month finishes.
+    """
+    with timed(timer, 'parse_datetimes', rows=len(attendance_data)):
+        prepare_punches(attendance_data)
+    with timed(timer, 'partition') as record:
+        partitions = month_partitions(attendance_data, hrms_data, start, end, shift_policy)
+        record['rows'] = len(partitions)
+
+    total = len(hrms_data) * len(partitions)
+    with timed(timer, 'classify_months', rows=total):
+        if len(partitions) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                month_reports = _collect(pool.map(_build_partition, partitions), len(hrms_data), total, progress)
+        else:
+            month_reports = _collect(map(_build_partition, partitions), len(hrms_data), total, progress)
+
+    sheets = {
+        sheet_name(partition['year'], partition['month']): report
+        for partition, report in zip(partitions, month_reports)
+    }
+    sheets[TOTALS_SHEET] = totals_frame(hrms_data, month_reports)
+    return sheets
+
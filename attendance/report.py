@@ -0,0 +1,82 @@
+"""
+Report entry points shared by the Streamlit app, the batch and
+incremental CLIs and any other script: classify, then write the workbook
+or tables. Nothing here imports Streamlit, and the Excel libraries are
+only imported once a workbook is written.
+"""
+from attendance.instrument import timed
+from attendance.pipeline import build_report
+from attendance.ranges import build_range_report
+from attendance.shards import write_shard_archive
+from attendance.writer import SHEET_NAME, write_export
+
+
+def build_sheets(attendance_data, hrms_data, date_range=None, shift_policy=None, timer=None, progress=None,
+                 workers=1, memo=None):
+    """
+    {sheet name: report} for generate_report and the sharded archive;
+    every sheet has one row per HRMS row. A single month is classified on
+    `workers` processes and through `memo` (an EmployeeMemo) if given; a
+    range runs up to `workers` months in parallel instead.
+    """
+    if date_range is None:
+        return {SHEET_NAME: build_report(attendance_data, hrms_data, shift_policy=shift_policy, timer=timer,
+                                         progress=progress, workers=workers, memo=memo)}
+    return build_range_report(attendance_data, hrms_data, *date_range, workers=workers, shift_policy=shift_policy,
+                              timer=timer, progress=progress)
+
+
+def generate_exports(attendance_data, hrms_data, formats, excel_writer='fast', date_range=None, shift_policy=None,
+                     timer=None, progress=None, workers=1, memo=None):
+    """
+    Classify once and write every format in `formats` (keys of
+    EXPORT_FORMATS): {format: BytesIO}. See generate_report.
+    """
+    sheets = build_sheets(attendance_data, hrms_data, date_range=date_range, shift_policy=shift_policy,
+                          timer=timer, progress=progress, workers=workers, memo=memo)
+    return {fmt: write_export(sheets, fmt, writer=excel_writer, timer=timer) for fmt in formats}
+
+
+def generate_report(attendance_data, hrms_data, excel_writer='fast', date_range=None, shift_policy=None,
+                    timer=None, progress=None, workers=1, memo=None):
+    """
+    Build the report workbook. With date_range=(start, end) every month in
+    the range gets its own sheet plus a Totals sheet; None bounds default
+    to the first/last punch date. `shift_policy` is a ShiftPolicy for late
+    detection, `timer` an optional StageTimer and `progress` an optional
+    progress(employees done, total) callback. `workers` processes classify
+    shards of employees (None for the CPU count) and an EmployeeMemo `memo`
+    reuses the rows of unchanged employees. Raises ValueError when the
+    punches have no valid date.
+    """
+    return generate_exports(attendance_data, hrms_data, ['xlsx'], excel_writer=excel_writer, date_range=date_range,
+                            shift_policy=shift_policy, timer=timer, progress=progress, workers=workers,
+                            memo=memo)['xlsx']
+
+
+def write_shards(sheets, hrms_data, shard_by, dest, excel_writer='fast', timer=None, workers=None):
+    """
+    Write one workbook per value of the HRMS column shard_by into the ZIP
+    file dest. Returns the shard summaries.
+    """
+    with timed(timer, 'write_shards', rows=len(hrms_data)) as record:
+        summaries = write_shard_archive(sheets, hrms_data, shard_by, dest, writer=excel_writer, workers=workers)
+        record['shards'] = len(summaries)
+    return summaries
+
+
+def process_attendance(attendance_data, hrms_data, excel_writer='fast', date_range=None, shift_policy=None,
+                       timer=None, export_format='xlsx', workers=1, memo=None):
+    """
+    generate_report for callers that report errors themselves: returns
+    (output, None), or (None, message) when the input cannot be processed.
+    export_format 'csv' or 'parquet' gives the unstyled table instead of
+    the workbook.
+    """
+    try:
+        output = generate_exports(attendance_data, hrms_data, [export_format], excel_writer=excel_writer,
+                                  date_range=date_range, shift_policy=shift_policy, timer=timer,
+                                  workers=workers, memo=memo)[export_format]
+    except ValueError as e:
+        return None, str(e)
+    return output, None
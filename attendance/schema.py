@@ -0,0 +1,154 @@
+"""
+Header-only layout detection for the two uploads.
+
+The biometric export comes in two layouts: the standard one read by
+app.py (Employee_ID, Punch_Date, Punch_In_Time, Punch_Out_Time,
+Shift_Name) and the single-punch one of the app1.py/app5.py exports
+(employee_id, Punch IN Time, shift_name). Headers are matched after
+normalizing case, spaces and underscores, and every layout is mapped
+onto the canonical BIOMETRIC_COLUMNS. inspect_biometric/inspect_hrms
+check the header and a few rows and raise ValueError with a precise
+message before anything is fully parsed.
+"""
+import re
+from zipfile import BadZipFile
+
+import pandas as pd
+
+from attendance.datetimes import detect_format
+
+BIOMETRIC_COLUMNS = ['Employee_ID', 'Punch_Date', 'Punch_In_Time', 'Punch_Out_Time', 'Shift_Name']
+HRMS_COLUMNS = ['Employee Id', 'Employee Name']
+# HRMS day columns are named DD-MM-YYYY
+DAY_COLUMN_PATTERN = re.compile(r'^\d{2}-\d{2}-\d{4}$')
+SAMPLE_ROWS = 20
+
+# Canonical column -> source column of each layout, most specific first.
+# The single-punch exports have no date or punch-out column: the punch-in
+# gives the date and also stands in for the punch-out, so a punched day
+# counts as present (with no worked time) as it did in those scripts.
+BIOMETRIC_LAYOUTS = {
+    'standard': {column: column for column in BIOMETRIC_COLUMNS},
+    'single punch': {
+        'Employee_ID': 'employee_id',
+        'Punch_Date': 'Punch IN Time',
+        'Punch_In_Time': 'Punch IN Time',
+        'Punch_Out_Time': 'Punch IN Time',
+        'Shift_Name': 'shift_name',
+    },
+}
+
+
+def normalize_name(name):
+    """
+    Header name compared case-insensitively, with runs of spaces and
+    underscores treated alike ('Punch IN Time' == 'Punch_In_Time')
+    """
+    return re.sub(r'[\s_]+', '_', str(name).strip()).lower()
+
+
+def match_biometric_header(header):
+    """
+    (layout name, {canonical column: position in header}) for the first
+    layout whose columns are all in header. Raises ValueError naming the
+    missing columns of the closest layout.
+    """
+    positions = {}
+    for i, name in enumerate(header):
+        if name is not None:
+            positions.setdefault(normalize_name(name), i)
+
+    closest = None
+    for layout, sources in BIOMETRIC_LAYOUTS.items():
+        missing = sorted({source for source in sources.values() if normalize_name(source) not in positions})
+        if not missing:
+            return layout, {column: positions[normalize_name(source)] for column, source in sources.items()}
+        if closest is None or len(missing) < len(closest[1]):
+            closest = (layout, missing)
+
+    found = ', '.join(str(name) for name in header if name is not None) or 'none'
+    raise ValueError(f"The biometric file matches no known layout. Closest is the {closest[0]} layout, "
+                     f"which is missing: {', '.join(closest[1])}. Columns found: {found}")
+
+
+def hrms_column_names(header):
+    """
+    {header name: canonical name} for the HRMS identity columns, so
+    'employee id' or 'EMPLOYEE_ID' are read as 'Employee Id'. Raises
+    ValueError when they or the DD-MM-YYYY day columns are missing.
+    """
+    canonical = {normalize_name(column): column for column in HRMS_COLUMNS}
+    renames = {name: canonical[normalize_name(name)] for name in header if normalize_name(name) in canonical}
+    missing = [column for column in HRMS_COLUMNS if column not in renames.values()]
+    if missing:
+        raise ValueError(f"The HRMS file is missing: {', '.join(missing)}. "
+                         f"Columns found: {', '.join(map(str, header)) or 'none'}")
+    if not any(DAY_COLUMN_PATTERN.match(str(name)) for name in header):
+        raise ValueError("The HRMS file has no day columns; expected one column per day named DD-MM-YYYY")
+    return renames
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def inspect_biometric(attendance_file, sample_rows=SAMPLE_ROWS):
+    """
+    Check the biometric workbook from its header and first sample_rows
+    rows only and return its layout name. Raises ValueError when the
+    layout is unknown, the sheet has no rows, or no sampled employee id or
+    punch date is readable.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(attendance_file, read_only=True, data_only=True)
+    except (InvalidFileException, BadZipFile, KeyError, OSError) as e:
+        raise ValueError(f"The biometric file is not a readable .xlsx workbook ({e})") from e
+    try:
+        rows = workbook.active.iter_rows(values_only=True, max_row=sample_rows + 1)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("The biometric file is empty")
+        layout, positions = match_biometric_header(header)
+        sample = [row for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+        _rewind(attendance_file)
+
+    if not sample:
+        raise ValueError("The biometric file has a header but no punch rows")
+
+    def values(column):
+        position = positions[column]
+        return [row[position] for row in sample if position < len(row) and row[position] is not None]
+
+    source = BIOMETRIC_LAYOUTS[layout]
+    if not values('Employee_ID'):
+        raise ValueError(f"Column '{source['Employee_ID']}' is empty in the first {len(sample)} rows")
+    dates = values('Punch_Date')
+    text = [value for value in dates if isinstance(value, str)]
+    if not dates or (len(text) == len(dates) and detect_format(text) is None):
+        example = f" (e.g. {text[0]!r})" if text else ''
+        raise ValueError(f"Column '{source['Punch_Date']}' has no readable dates in the first "
+                         f"{len(sample)} rows{example}")
+    return layout
+
+
+def inspect_hrms(hrms_file, sample_rows=SAMPLE_ROWS):
+    """
+    Check the HRMS CSV from its header and first sample_rows rows only and
+    return its day column names. Raises ValueError with the problem.
+    """
+    try:
+        sample = pd.read_csv(hrms_file, nrows=sample_rows)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"The HRMS file is not a readable CSV ({e})") from e
+    finally:
+        _rewind(hrms_file)
+    hrms_column_names(sample.columns)
+    if sample.empty:
+        raise ValueError("The HRMS file has a header but no employee rows")
+    return [column for column in sample.columns if DAY_COLUMN_PATTERN.match(str(column))]
@@ -0,0 +1,112 @@
+"""
+Split a processed report by an HRMS grouping column (department, location,
+manager, ...) into one workbook per group, written concurrently and
+streamed into a ZIP archive on disk.
+"""
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from attendance.grid import StatusGrid
+from attendance.schema import DAY_COLUMN_PATTERN, HRMS_COLUMNS, normalize_name
+from attendance.writer import write_workbook
+
+UNASSIGNED = 'Unassigned'
+
+
+def grouping_columns(hrms_data):
+    """
+    HRMS columns that can be used to shard the report: all but the
+    identity columns, matched the way the HRMS reader matches them (so
+    'employee id' is one), and the DD-MM-YYYY day columns
+    """
+    identity = {normalize_name(column) for column in HRMS_COLUMNS}
+    return [column for column in hrms_data.columns
+            if normalize_name(column) not in identity and not DAY_COLUMN_PATTERN.match(str(column))]
+
+
+def shard_rows(hrms_data, column):
+    """
+    {group name: row positions} for an HRMS grouping column. Report sheets
+    have one row per HRMS row in the same order, so the positions select
+    a group's rows from every sheet. Blank values go to 'Unassigned'.
+    """
+    if column not in hrms_data.columns:
+        raise ValueError(f"HRMS data has no column {column!r} to split by")
+    values = hrms_data[column].astype(object).where(hrms_data[column].notna(), UNASSIGNED)
+    values = values.map(lambda value: str(value).strip() or UNASSIGNED)
+    codes, groups = pd.factorize(values, sort=True)
+    return {group: (codes == code).nonzero()[0] for code, group in enumerate(groups)}
+
+
+def shard_file_name(group, prefix='attendance_report'):
+    """
+    Archive member name for a group, safe on every file system
+    """
+    safe = re.sub(r'[^\w.-]+', '_', group).strip('._') or UNASSIGNED
+    return f'{prefix}_{safe}.xlsx'
+
+
+def _write_shard(sheets, writer, path):
+    """
+    Worker: write one shard's workbook to path and return its size
+    """
+    with open(path, 'wb') as f:
+        f.write(write_workbook(sheets, writer=writer).getbuffer())
+    return os.path.getsize(path)
+
+
+def write_shard_archive(sheets, hrms_data, column, dest, writer='fast', workers=None):
+    """
+    Write one workbook per group of `column` into the ZIP file `dest`.
+
+    `sheets` maps sheet name to report StatusGrid or DataFrame (one row
+    per HRMS row);
+    every shard gets all sheets restricted to its employees. Shards are
+    written to a temporary directory by a process pool and added to the
+    archive as they finish, each file deleted once it is in the archive,
+    so neither the archive nor more than `workers` shards are held in
+    memory. Returns one summary row per shard.
+    """
+    shards = shard_rows(hrms_data, column)
+    names = {}
+    for group in shards:
+        name = shard_file_name(group)
+        # Distinct groups can map to one safe name ('A/B' and 'A B')
+        if name in names.values():
+            name = name.replace('.xlsx', f'_{len(names)}.xlsx')
+        names[group] = name
+
+    summaries = []
+    with tempfile.TemporaryDirectory(prefix='attendance-shards-') as workdir, \
+            zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_STORED) as archive:
+
+        def add(group, size):
+            path = Path(workdir) / names[group]
+            # .xlsx files are already deflated; storing them avoids a second pass
+            archive.write(path, arcname=names[group])
+            path.unlink()
+            summaries.append({'group': group, 'file': names[group], 'employees': len(shards[group]),
+                              'bytes': size})
+
+        def shard_sheets(rows):
+            return {name: report.take(rows) if isinstance(report, StatusGrid)
+                    else report.iloc[rows].reset_index(drop=True) for name, report in sheets.items()}
+
+        if workers == 1 or len(shards) == 1:
+            for group, rows in shards.items():
+                add(group, _write_shard(shard_sheets(rows), writer, Path(workdir) / names[group]))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_write_shard, shard_sheets(rows), writer, Path(workdir) / names[group]): group
+                    for group, rows in shards.items()
+                }
+                for future in as_completed(futures):
+                    add(futures[future], future.result())
+    return summaries
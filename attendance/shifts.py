@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Shift name -> late policy. 'cutoff' is the last on-time HH:MM; it can be
+# given directly or as 'start' plus 'grace' minutes. 'label' prefixes the
+# late cell, e.g. 'GSL 09:52'.
+DEFAULT_SHIFT_POLICIES = {
+    'General': {'cutoff': '09:45', 'label': 'GSL'},
+    'Evening Shift': {'cutoff': '16:30', 'label': 'ESL'},
+}
+POLICY_TABLE_COLUMNS = ['shift', 'start', 'grace', 'cutoff', 'label']
+
+# 'HH:MM' for every minute of the day, indexed by minutes since midnight
+MINUTE_LABELS = np.array([f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(24 * 60)], dtype=object)
+
+
+def normalize_shift_name(name):
+    return str(name).strip().lower()
+
+
+def parse_hhmm(value):
+    """
+    'HH:MM' -> minutes since midnight
+    """
+    hours, minutes = str(value).strip().split(':')[:2]
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time of day: {value!r}")
+    return hours * 60 + minutes
+
+
+def minutes_since_midnight(times):
+    """
+    Integer minutes since midnight of a datetime Series, -1 where missing.
+    Seconds are dropped, matching the HH:MM comparison the report used.
+    """
+    missing = times.isna().to_numpy()
+    minutes = (times.dt.hour.to_numpy(dtype=float, na_value=0) * 60
+               + times.dt.minute.to_numpy(dtype=float, na_value=0))
+    return np.where(missing, -1, minutes).astype(np.int16)
+
+
+class ShiftPolicy:
+    """
+    Shift-policy table compiled once into normalized shift names, integer
+    cutoff minutes and late labels, so late detection is a single array
+    comparison over shift codes and punch-in minutes.
+    """
+
+    def __init__(self, policies=None):
+        policies = DEFAULT_SHIFT_POLICIES if policies is None else policies
+        self.names = []
+        cutoffs, labels = [], []
+        for name, policy in policies.items():
+            if policy.get('cutoff'):
+                cutoff = parse_hhmm(policy['cutoff'])
+            elif policy.get('start'):
+                cutoff = parse_hhmm(policy['start']) + int(policy.get('grace') or 0)
+            else:
+                raise ValueError(f"Shift {name!r} needs a cutoff or a start time")
+            if not policy.get('label'):
+                raise ValueError(f"Shift {name!r} needs a label")
+            self.names.append(normalize_shift_name(name))
+            cutoffs.append(cutoff)
+            labels.append(str(policy['label']))
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        # A trailing entry serves code -1 (no policy): its cutoff is never passed
+        self.cutoff_minutes = np.array(cutoffs + [np.iinfo(np.int16).max], dtype=np.int16)
+        self.labels = np.array(labels + [None], dtype=object)
+
+    def cache_key(self):
+        return json.dumps([self.names, self.cutoff_minutes[:-1].tolist(), self.labels[:-1].tolist()])
+
+    def shift_codes(self, shift_names):
+        """
+        Policy code per row (-1 for shifts without a policy). Names are
+        normalized once per distinct value through the categorical.
+        """
+        categorical = pd.Categorical(shift_names)
+        category_codes = np.array(
+            [self.codes.get(normalize_shift_name(name), -1) for name in categorical.categories] + [-1],
+            dtype=np.int8,
+        )
+        # Missing names have categorical code -1, which picks the trailing -1
+        return category_codes[categorical.codes]
+
+    def late_flags(self, shift_codes, in_minutes):
+        """
+        True where the punch-in minute is past the shift's cutoff
+        """
+        return (in_minutes >= 0) & (in_minutes > self.cutoff_minutes[shift_codes])
+
+
+def policies_from_table(table):
+    """
+    Shift policies from a table with shift/start/grace/cutoff/label columns
+    """
+    policies = {}
+    for row in table.to_dict('records'):
+        name = row.get('shift')
+        if name is None or pd.isna(name) or not str(name).strip():
+            continue
+        policies[str(name).strip()] = {
+            key: row.get(key) for key in ('start', 'grace', 'cutoff', 'label')
+            if row.get(key) is not None and not pd.isna(row.get(key))
+        }
+    return policies
+
+
+def policy_table(policies=None):
+    policies = DEFAULT_SHIFT_POLICIES if policies is None else policies
+    return pd.DataFrame(
+        [{'shift': name, **policy} for name, policy in policies.items()], columns=POLICY_TABLE_COLUMNS
+    )
+
+
+def load_shift_policies(path):
+    """
+    Read shift policies from a JSON file shaped like DEFAULT_SHIFT_POLICIES
+    """
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,88 @@
+from calendar import monthrange
+
+import numpy as np
+import pandas as pd
+
+from attendance.engine import day_columns
+
+# Share of each HRMS code across employee-days
+DEFAULT_CODE_MIX = {
+    'PT': 0.70,
+    'WFH': 0.05,
+    'PL/PT': 0.02,
+    'CL/PT': 0.02,
+    'HD': 0.03,
+    'WOff': 0.12,
+    'PL': 0.02,
+    'CL': 0.02,
+    'LL': 0.005,
+    'LWP': 0.005,
+    'Not Enrolled': 0.01,
+}
+# Shift name as exported by the device -> scheduled start (hour, minute)
+DEFAULT_SHIFTS = {
+    'General': (9, 30),
+    'Evening Shift': (16, 15),
+}
+# Codes whose days carry a biometric punch
+PUNCHED_CODES = ['PT', 'PL/PT', 'CL/PT']
+
+
+def generate_inputs(n_employees, month=1, year=2024, code_mix=None, punch_miss_rate=0.05,
+                    absent_rate=0.03, late_rate=0.15, seed=0, extra_columns=10):
+    """
+    Deterministic synthetic (attendance_data, hrms_data) pair in the app.py
+    layout.
+
+    code_mix maps HRMS codes to weights (normalized to sum to 1). Punched
+    days get a biometric row unless the employee is absent (absent_rate);
+    punch_miss_rate is split evenly between missing IN and missing OUT
+    punches. late_rate of punched days arrive after the shift's grace
+    cutoff. extra_columns adds unused device columns, as real exports have.
+    """
+    rng = np.random.default_rng(seed)
+    code_mix = code_mix or DEFAULT_CODE_MIX
+    codes = np.array(list(code_mix), dtype=object)
+    weights = np.array(list(code_mix.values()), dtype=float)
+    weights /= weights.sum()
+    _, days_in_month = monthrange(year, month)
+
+    employee_ids = np.arange(100000, 100000 + n_employees)
+    hrms_codes = rng.choice(codes, size=(n_employees, days_in_month), p=weights)
+    hrms_data = pd.DataFrame(hrms_codes, columns=day_columns(month, year, days_in_month))
+    hrms_data.insert(0, 'Employee Id', employee_ids)
+    hrms_data.insert(1, 'Employee Name', [f'Employee {i}' for i in range(n_employees)])
+
+    shift_names = np.array(list(DEFAULT_SHIFTS), dtype=object)
+    employee_shift = rng.integers(0, len(shift_names), n_employees)
+
+    # One biometric row per punched employee-day
+    punched = np.isin(hrms_codes, PUNCHED_CODES) & (rng.random(hrms_codes.shape) >= absent_rate)
+    rows, days = np.nonzero(punched)
+    n_punches = len(rows)
+
+    start_minutes = np.array([hour * 60 + minute for hour, minute in DEFAULT_SHIFTS.values()])
+    shift = employee_shift[rows]
+    late = rng.random(n_punches) < late_rate
+    offset = np.where(late, rng.integers(16, 90, n_punches), rng.integers(-30, 15, n_punches))
+    in_minutes = start_minutes[shift] + offset
+    out_minutes = in_minutes + rng.integers(7 * 60, 10 * 60, n_punches)
+
+    punch_date = pd.to_datetime({'year': year, 'month': month, 'day': days + 1})
+    punch_in = punch_date + pd.to_timedelta(in_minutes, unit='m') + pd.to_timedelta(rng.integers(0, 60, n_punches), unit='s')
+    punch_out = punch_date + pd.to_timedelta(out_minutes, unit='m')
+
+    miss = rng.random(n_punches)
+    punch_in = punch_in.where(~(miss < punch_miss_rate / 2))
+    punch_out = punch_out.where(~((miss >= punch_miss_rate / 2) & (miss < punch_miss_rate)))
+
+    attendance_data = pd.DataFrame({
+        'Employee_ID': employee_ids[rows],
+        'Punch_Date': punch_date,
+        'Punch_In_Time': punch_in,
+        'Punch_Out_Time': punch_out,
+        'Shift_Name': shift_names[shift],
+    })
+    for i in range(extra_columns):
+        attendance_data[f'Device_Field_{i + 1}'] = rng.integers(0, 1000, n_punches)
+    return attendance_data, hrms_data
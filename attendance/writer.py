@@ -0,0 +1,285 @@
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+
+from attendance.grid import StatusGrid
+from attendance.instrument import timed
+
+SHEET_NAME = 'Attendance Report'
+
+# Colour legend for the day cells, shared by both writers
+CATEGORY_COLORS = {
+    'HD': 'B0C4DE',
+    'WOff': 'D3D3D3',
+    'PL': '98FB98',
+    'CL': 'ADD8E6',
+    'LL': 'FFA07A',
+    'LWP': 'eb9c42',
+    'WFH': 'FFFACD',
+    'Morning Punch Miss': 'FF9999',
+    'Evening Punch Miss': 'FFB366',
+    'AT': 'FF0000',
+    'PT': '00FF00',
+    'Not Enrolled': 'eb4d4d',
+    'Half Day': 'FFFF00',
+}
+# Late arrivals are written as '<label> HH:MM' and coloured by the shift
+# policy's label; labels without a colour of their own use LATE_COLOR
+PREFIX_COLORS = {
+    'GSL': 'd8aaf2',
+    'ESL': '83f7f0',
+}
+LATE_COLOR = 'c9a0dc'
+EMPLOYEE_COLOR = CATEGORY_COLORS['PT']
+
+# Output formats: the styled workbook and unstyled tables for downstream
+# systems such as payroll imports
+EXPORT_FORMATS = {
+    'xlsx': {'label': 'Styled Excel (.xlsx)',
+             'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+    'csv': {'label': 'CSV (.csv)', 'mime': 'text/csv'},
+    'parquet': {'label': 'Parquet (.parquet)', 'mime': 'application/vnd.apache.parquet'},
+}
+
+
+def column_widths(output_data):
+    """
+    Column widths from the in-memory report: longest value or header + 2
+    """
+    widths = []
+    for column in output_data.columns:
+        lengths = output_data[column].dropna().astype(str).str.len()
+        longest = max(len(str(column)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(longest + 2)
+    return widths
+
+
+def write_report(output_data, writer='fast', timer=None):
+    """
+    Write the report (a DataFrame or a StatusGrid) to an in-memory .xlsx
+    workbook.
+
+    writer='fast' streams the values once through xlsxwriter in constant
+    memory mode and colours the day cells with conditional formatting rules.
+    writer='openpyxl' is the original to_excel + per-cell PatternFill pass;
+    it is also used when xlsxwriter is not installed. `timer` is an
+    optional StageTimer.
+    """
+    return write_workbook({SHEET_NAME: output_data}, writer=writer, timer=timer)
+
+
+def write_workbook(sheets, writer='fast', timer=None):
+    """
+    Write several reports, one per sheet, to one workbook. `sheets` maps
+    sheet name to DataFrame or StatusGrid; see write_report for the rest.
+    The openpyxl writer colours StatusGrid day cells from their codes.
+    """
+    prefix_colors = late_colors(sheets.values())
+    with timed(timer, 'render', rows=sum(len(report) for report in sheets.values())):
+        sheets = {name: _sheet(report) for name, report in sheets.items()}
+    if writer == 'fast':
+        try:
+            import xlsxwriter
+        except ImportError:
+            writer = 'openpyxl'
+        else:
+            with timed(timer, 'write_excel', rows=sum(len(frame) for frame, _ in sheets.values())):
+                return _write_xlsxwriter(sheets, xlsxwriter, prefix_colors)
+    if writer != 'openpyxl':
+        raise ValueError(f"Unknown Excel writer: {writer}")
+    return _write_openpyxl(sheets, timer)
+
+
+def late_colors(reports):
+    """
+    {late label: fill colour} for the late labels of the StatusGrid
+    reports, on top of PREFIX_COLORS
+    """
+    colors = dict(PREFIX_COLORS)
+    for report in reports:
+        if isinstance(report, StatusGrid):
+            for label, late in zip(report.labels, report.late):
+                if late:
+                    colors.setdefault(str(label), LATE_COLOR)
+    return colors
+
+
+def _sheet(report):
+    """
+    (DataFrame, day-cell colours or None) for a DataFrame or a StatusGrid
+    """
+    if isinstance(report, StatusGrid):
+        return report.to_frame(), report.fill_colors(CATEGORY_COLORS, PREFIX_COLORS, LATE_COLOR)
+    return report, None
+
+
+def _write_xlsxwriter(sheets, xlsxwriter, prefix_colors):
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+
+    # Same header style as pandas' to_excel
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    employee_format = workbook.add_format({'bg_color': f'#{EMPLOYEE_COLOR}', 'pattern': 1})
+    prefix_formats = {
+        prefix: workbook.add_format({'bg_color': f'#{color}', 'pattern': 1})
+        for prefix, color in prefix_colors.items()
+    }
+    category_formats = {
+        category: workbook.add_format({'bg_color': f'#{color}', 'pattern': 1})
+        for category, color in CATEGORY_COLORS.items()
+    }
+
+    for sheet_name, (output_data, _) in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+
+        for col, width in enumerate(column_widths(output_data)):
+            worksheet.set_column(col, col, width)
+        for col, name in enumerate(output_data.columns):
+            worksheet.write_string(0, col, str(name), header_format)
+
+        columns = [output_data[column].tolist() for column in output_data.columns]
+        for row, values in enumerate(zip(*columns), start=1):
+            for col, value in enumerate(values):
+                if value is None or (isinstance(value, float) and value != value):
+                    continue
+                worksheet.write(row, col, value, employee_format if col < 2 else None)
+
+        # Colour legend as worksheet rules over the day and count columns
+        n_rows = len(output_data)
+        if n_rows and len(output_data.columns) > 3:
+            first_row, first_col, last_row, last_col = 1, 3, n_rows, len(output_data.columns) - 1
+            for prefix, cell_format in prefix_formats.items():
+                worksheet.conditional_format(first_row, first_col, last_row, last_col, {
+                    'type': 'text',
+                    'criteria': 'begins with',
+                    'value': f'{prefix} ',
+                    'format': cell_format,
+                })
+            for category, cell_format in category_formats.items():
+                worksheet.conditional_format(first_row, first_col, last_row, last_col, {
+                    'type': 'cell',
+                    'criteria': '==',
+                    'value': f'"{category}"',
+                    'format': cell_format,
+                })
+
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def _write_openpyxl(sheets, timer=None):
+    output = BytesIO()
+    rows = sum(len(frame) for frame, _ in sheets.values())
+    with timed(timer, 'to_excel', rows=rows):
+        writer = pd.ExcelWriter(output, engine='openpyxl')
+        for sheet_name, (output_data, _) in sheets.items():
+            output_data.to_excel(writer, index=False, sheet_name=sheet_name)
+    with timed(timer, 'fill', rows=rows):
+        for sheet_name, (_, day_colors) in sheets.items():
+            style_worksheet(writer.sheets[sheet_name], day_colors)
+    with timed(timer, 'save_excel', rows=rows):
+        writer.close()
+
+    output.seek(0)
+    return output
+
+
+def style_worksheet(worksheet, day_colors=None):
+    """
+    Per-cell PatternFill pass of the openpyxl writer. `day_colors` are the
+    per-cell colours of the day columns from StatusGrid.fill_colors(); the
+    cells are matched by their text when it is None.
+    """
+    from openpyxl.styles import PatternFill
+
+    # Color mapping
+    category_colors = {
+        category: PatternFill(start_color=color, end_color=color, fill_type='solid')
+        for category, color in CATEGORY_COLORS.items()
+    }
+
+    # Apply green color to Employee Id and Employee Name columns
+    pt_fill = category_colors['PT']
+    for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=1, max_col=2):
+        for cell in row:
+            cell.fill = pt_fill
+
+    if day_colors is not None:
+        fills = {color: PatternFill(start_color=color, end_color=color, fill_type='solid')
+                 for color in set(day_colors.flat) if color}
+        for row, colors in enumerate(day_colors, start=2):
+            for col, color in enumerate(colors, start=4):
+                if color:
+                    worksheet.cell(row=row, column=col).fill = fills[color]
+        return
+
+    # Late cells are matched by their '<label> ' prefix
+    prefix_fills = {
+        f'{prefix} ': PatternFill(start_color=color, end_color=color, fill_type='solid')
+        for prefix, color in PREFIX_COLORS.items()
+    }
+
+    for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=4, max_col=worksheet.max_column):
+        for cell in row:
+            if cell.value:
+                # Convert cell value to string before checking
+                cell_value = str(cell.value)
+                prefix = next((prefix for prefix in prefix_fills if cell_value.startswith(prefix)), None)
+                if prefix:
+                    cell.fill = prefix_fills[prefix]
+                elif cell_value in category_colors:
+                    cell.fill = category_colors[cell_value]
+
+
+def write_table(output_data, fmt):
+    """
+    The report (a DataFrame or a StatusGrid) as an unstyled CSV or Parquet
+    file in memory, with the same columns as the workbook
+    """
+    if isinstance(output_data, StatusGrid):
+        output_data = output_data.to_frame()
+    output = BytesIO()
+    if fmt == 'csv':
+        output_data.to_csv(output, index=False)
+    elif fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow installed") from None
+        output_data.to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Unknown table format: {fmt}")
+    output.seek(0)
+    return output
+
+
+def export_file_name(base, fmt, n_sheets=1):
+    """
+    Download name for an export: tables of several sheets come as a ZIP
+    """
+    if fmt != 'xlsx' and n_sheets > 1:
+        return f'{base}_{fmt}.zip'
+    return f'{base}.{fmt}'
+
+
+def write_export(sheets, fmt, writer='fast', timer=None):
+    """
+    Write `sheets` ({sheet name: DataFrame or StatusGrid}) in one of
+    EXPORT_FORMATS. 'xlsx' is the styled workbook from write_workbook; the
+    table formats skip workbook generation and styling entirely and give
+    one file, or a ZIP with one file per sheet when there are several.
+    """
+    if fmt == 'xlsx':
+        return write_workbook(sheets, writer=writer, timer=timer)
+    rows = sum(len(report) for report in sheets.values())
+    with timed(timer, f'write_{fmt}', rows=rows):
+        if len(sheets) == 1:
+            return write_table(next(iter(sheets.values())), fmt)
+        output = BytesIO()
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for sheet_name, report in sheets.items():
+                archive.writestr(f'{sheet_name}.{fmt}', write_table(report, fmt).getbuffer())
+        output.seek(0)
+        return output
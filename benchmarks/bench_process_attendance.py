@@ -0,0 +1,177 @@
+"""
+Benchmark the attendance pipeline on synthetic inputs.
+
+    python benchmarks/bench_process_attendance.py --sizes 100 1000 10000 50000 --output results.json
+    python benchmarks/bench_process_attendance.py --sizes 1000 --compare results.json
+    python benchmarks/bench_process_attendance.py --sizes 50000 --classify-workers 4
+    python benchmarks/bench_process_attendance.py --sizes 10000 --trace-memory
+
+Stages are timed separately: parse (biometric .xlsx + HRMS .csv), classify,
+classify_parallel (with --classify-workers, with its speedup over
+classify), write_fast (xlsxwriter), write_openpyxl (to_excel + save) and
+style_openpyxl (the PatternFill pass). Each stage reports the best of
+--repeat runs. --trace-memory adds one run of build_report and the fast
+writer under tracemalloc, reported as traced_<stage> rows with the stage's
+peak traced memory; tracing slows those stages, so their times are not
+comparable with the untraced ones. Results are written as JSON so runs from different versions
+can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from attendance.ingest import read_biometric, read_hrms  # noqa: E402
+from attendance.instrument import StageTimer  # noqa: E402
+from attendance.pipeline import build_report  # noqa: E402
+from attendance.synthetic import DEFAULT_CODE_MIX, generate_inputs  # noqa: E402
+from attendance.writer import write_report  # noqa: E402
+
+EXCEL_MAX_ROWS = 1_048_576
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+
+
+def best_of(repeat, func):
+    """
+    Run func `repeat` times; return (best seconds, last result)
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def time_openpyxl(output_data):
+    """
+    Time to_excel + save and the styling pass of the openpyxl writer apart
+    """
+    timer = StageTimer(track_memory=False)
+    write_report(output_data, writer='openpyxl', timer=timer)
+    seconds = {record['stage']: record['seconds'] for record in timer.stages}
+    return seconds['to_excel'] + seconds['save_excel'], seconds['fill']
+
+
+def bench_size(n_employees, args, workdir):
+    attendance_data, hrms_data = generate_inputs(
+        n_employees, code_mix=args.code_mix, punch_miss_rate=args.punch_miss_rate, seed=args.seed)
+    results = []
+
+    def record(stage, seconds, **extra):
+        results.append({'employees': n_employees, 'punch_rows': len(attendance_data),
+                        'stage': stage, 'seconds': round(seconds, 6), **extra})
+        print(f"{n_employees:>7} employees  {stage:<22} {seconds:10.3f}s"
+              + (f"  ({extra['speedup']:.2f}x on {extra['workers']} workers)" if 'speedup' in extra else '')
+              + (f"  (peak {extra['peak_mb']:.1f} MB)" if 'peak_mb' in extra else ''),
+              flush=True)
+
+    if args.skip_parse:
+        pass
+    elif len(attendance_data) >= EXCEL_MAX_ROWS:
+        results.append({'employees': n_employees, 'punch_rows': len(attendance_data),
+                        'stage': 'parse', 'seconds': None, 'skipped': 'exceeds the Excel row limit'})
+    else:
+        biometric_path = Path(workdir) / f'biometric_{n_employees}.xlsx'
+        hrms_path = Path(workdir) / f'hrms_{n_employees}.csv'
+        attendance_data.to_excel(biometric_path, index=False)
+        hrms_data.to_csv(hrms_path, index=False)
+        seconds, _ = best_of(args.repeat, lambda: (read_biometric(biometric_path), read_hrms(hrms_path)))
+        record('parse', seconds)
+
+    seconds, output_data = best_of(args.repeat, lambda: build_report(attendance_data.copy(), hrms_data))
+    record('classify', seconds)
+
+    if args.classify_workers:
+        single = seconds
+        seconds, _ = best_of(args.repeat, lambda: build_report(attendance_data.copy(), hrms_data,
+                                                               workers=args.classify_workers))
+        record('classify_parallel', seconds, workers=args.classify_workers, speedup=round(single / seconds, 2))
+
+    seconds, _ = best_of(args.repeat, lambda: write_report(output_data, writer='fast'))
+    record('write_fast', seconds)
+
+    if not args.skip_openpyxl:
+        timings = [time_openpyxl(output_data) for _ in range(args.repeat)]
+        record('write_openpyxl', min(write for write, _ in timings))
+        record('style_openpyxl', min(style for _, style in timings))
+
+    if args.trace_memory:
+        timer = StageTimer(track_memory=True)
+        write_report(build_report(attendance_data.copy(), hrms_data, timer=timer), writer='fast', timer=timer)
+        for stage in timer.stages:
+            record(f"traced_{stage['stage']}", stage['seconds'], peak_mb=stage['peak_mb'])
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    previous = {(row['employees'], row['stage']): row['seconds'] for row in baseline['results']}
+    print(f"\nCompared with {baseline_path} (revision {baseline.get('revision')}):")
+    for row in results:
+        before = previous.get((row['employees'], row['stage']))
+        if before and row['seconds']:
+            print(f"{row['employees']:>7} employees  {row['stage']:<15} {before:10.3f}s -> "
+                  f"{row['seconds']:10.3f}s  ({before / row['seconds']:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark process_attendance stages on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="employee counts")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage; the best is reported")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--punch-miss-rate', type=float, default=0.05)
+    parser.add_argument('--code-mix', type=json.loads, default=DEFAULT_CODE_MIX,
+                        help='JSON object of HRMS code weights, e.g. \'{"PT": 0.8, "WOff": 0.2}\'')
+    parser.add_argument('--skip-parse', action='store_true', help="do not write and re-read the inputs")
+    parser.add_argument('--skip-openpyxl', action='store_true', help="do not time the openpyxl writer")
+    parser.add_argument('--classify-workers', type=int,
+                        help="also time classification on this many processes and report the speedup")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also report each stage's peak traced memory from one tracemalloc run")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_employees in args.sizes:
+            results.extend(bench_size(n_employees, args, workdir))
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'settings': {'repeat': args.repeat, 'seed': args.seed, 'punch_miss_rate': args.punch_miss_rate,
+                     'code_mix': args.code_mix, 'classify_workers': args.classify_workers,
+                     'cpus': os.cpu_count()},
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())